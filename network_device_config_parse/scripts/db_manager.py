@@ -6,16 +6,204 @@ Database Manager - 数据库管理模块
 """
 
 import os
+import io
 import getpass
+import time
 import hashlib
 import json
-from typing import Dict, List, Any, Optional
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from datetime import datetime
 
+# JSON 编码：优先使用 orjson（未安装时回退到标准库 json）
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _dumps = json.dumps
+
+# 可选：配置内容以 zstd 压缩后存入 config_files.content_zstd（未安装时仍以文本存入 content）
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 批量写入超过此行数时改用 COPY 协议
+COPY_THRESHOLD = 1000
+
+# 建立连接失败时的最大尝试次数（指数退避：1, 2, 4 秒...）
+CONNECT_RETRIES = 3
+
+# 日志缓冲达到此条数时批量写入
+LOG_FLUSH_THRESHOLD = 500
+
+# 连接池大小
+POOL_MIN_CONNECTIONS = 2
+POOL_MAX_CONNECTIONS = 10
+
+# 每个连接首次使用时 PREPARE 的单行写入语句（名称 -> SQL）
+_PREPARED_STATEMENTS = {
+    # 设备元数据 upsert 与整组解析规则 upsert 合并为一条语句；规则以并行数组传入
+    'save_parsing_rule': """
+        WITH dm AS (
+            INSERT INTO device_metadata (vendor, device_type, model, software_version, config_format)
+            VALUES ($1, $2, $3, $4, $5)
+            ON CONFLICT (vendor, device_type, model, software_version)
+            DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        ), rules AS (
+            INSERT INTO parsing_rules
+            (rule_name, rule_category, device_metadata_id, regex_pattern,
+             pattern_description, priority, is_active)
+            SELECT t.rule_name, t.rule_category, dm.id, t.regex_pattern,
+                   t.pattern_description, 0, TRUE
+            FROM dm, unnest($6::text[], $7::text[], $8::text[], $9::text[])
+                AS t(rule_name, rule_category, regex_pattern, pattern_description)
+            ON CONFLICT (rule_name) DO UPDATE SET
+                regex_pattern = EXCLUDED.regex_pattern,
+                updated_at = CURRENT_TIMESTAMP
+        )
+        SELECT id FROM dm
+    """,
+    # 一条语句完成 device_metadata -> config_files -> parse_results -> device_info ->
+    # interface_config 的级联写入；接口字段以并行数组传入并用 unnest 展开
+    'save_parse_result': """
+        WITH dm AS (
+            INSERT INTO device_metadata (vendor, device_type, model, software_version, config_format)
+            VALUES ($1, $2, $3, $4, $5)
+            ON CONFLICT (vendor, device_type, model, software_version)
+            DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+            RETURNING id
+        ), cf AS (
+            INSERT INTO config_files
+            (file_name, file_path, file_hash, file_size, content, content_preview,
+             identified_device_id, is_parsed, parse_status, uploaded_at, content_zstd)
+            SELECT $6::varchar, $7::text, $8::varchar, $9::bigint, $10::text, $11::text,
+                   dm.id, TRUE, $12::varchar, $13::timestamp, $30::bytea
+            FROM dm
+            ON CONFLICT (file_hash) DO UPDATE SET
+                parsed_at = EXCLUDED.parsed_at,
+                parse_status = EXCLUDED.parse_status
+            RETURNING id
+        ), pr AS (
+            INSERT INTO parse_results
+            (config_file_id, device_metadata_id, quality_score, validation_status,
+             validation_warnings, validation_errors, parsed_at)
+            SELECT cf.id, dm.id, $14::numeric, $15::varchar, $16::text[], $17::text[], $13::timestamp
+            FROM cf, dm
+            RETURNING id
+        ), di AS (
+            INSERT INTO device_info
+            (parse_result_id, hostname, management_ip, mac_address, serial_number,
+             hostname_valid, management_ip_valid, mac_address_valid)
+            SELECT pr.id, $18::varchar, $19::varchar, $20::varchar, $21::varchar,
+                   $22::boolean, $23::boolean, $24::boolean
+            FROM pr
+        ), ic AS (
+            INSERT INTO interface_config
+            (parse_result_id, interface_name, ip_address, subnet_mask, description, status)
+            SELECT pr.id, t.name, t.ip_address, t.subnet_mask, t.description, t.status
+            FROM pr, unnest($25::text[], $26::text[], $27::text[], $28::text[], $29::text[])
+                AS t(name, ip_address, subnet_mask, description, status)
+        )
+        SELECT id FROM pr
+    """,
+}
+
+# get_parse_summary 默认最多返回的行数
+PARSE_SUMMARY_LIMIT = 1000
+
+# iter_parse_summary 服务端游标每批读取的行数
+SUMMARY_ITERSIZE = 500
+
+# device_metadata 的唯一键字段
+_METADATA_KEY_FIELDS = ('vendor', 'device_type', 'model', 'software_version')
+
+# save_parse_results_bulk 写入 interface_config 的列
+_BULK_INTERFACE_COLUMNS = ('parse_result_id', 'interface_name', 'ip_address',
+                           'subnet_mask', 'description', 'status')
+
+# 配置内容的 zstd 压缩级别
+CONTENT_ZSTD_LEVEL = 3
+
+# 计算文件哈希时每次编码的字符数
+HASH_CHUNK_CHARS = 1 << 20
+
+# 规则名关键字 -> 规则类别（按优先级排列，先命中者生效）
+_CATEGORY_KEYWORDS = (
+    ('hostname', 'hostname'),
+    ('interface', 'interface'),
+    ('vlan', 'vlan'),
+    ('ip', 'ip_address'),
+    ('address', 'ip_address'),
+    ('mac', 'mac_address'),
+    ('serial', 'serial_number'),
+    ('description', 'description'),
+)
+
+# COPY 文本格式的转义表
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _copy_field(value: Any) -> str:
+    """将单个值编码为 COPY 文本格式字段（None 编码为 \\N）"""
+    if value is None:
+        return '\\N'
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _encode_content(content: str) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    编码配置内容用于写入 config_files
+
+    Returns:
+        (content 列, content_zstd 列)：安装 zstandard 时只存压缩后的 UTF-8 字节
+    """
+    if zstandard is None or not content:
+        return content, None
+    return None, zstandard.ZstdCompressor(level=CONTENT_ZSTD_LEVEL).compress(content.encode('utf-8'))
+
+
+def compute_file_hash(content: str) -> str:
+    """
+    计算配置内容的哈希（用作 config_files 去重键）
+
+    按 HASH_CHUNK_CHARS 分片编码并增量更新，避免一次性复制整份 UTF-8 内容。
+    仅用于去重而非安全用途，使用 BLAKE2b（16 字节摘要，与原 MD5 长度一致）。
+    """
+    if not content:
+        return ''
+    h = hashlib.blake2b(digest_size=16)
+    for i in range(0, len(content), HASH_CHUNK_CHARS):
+        h.update(content[i:i + HASH_CHUNK_CHARS].encode('utf-8'))
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def _infer_rule_category(rule_name: str) -> str:
+    """从规则名称推断类别（按 _CATEGORY_KEYWORDS 优先级匹配，结果按规则名缓存）"""
+    rule_lower = rule_name.lower()
+    for keyword, category in _CATEGORY_KEYWORDS:
+        if keyword in rule_lower:
+            return category
+    return 'general'
+
+
+class PreparedConnection(PgConnection):
+    """记录是否已在本会话中 PREPARE 常用语句的连接"""
+    statements_prepared = False
+
 
 @dataclass
 class DBConfig:
@@ -25,6 +213,11 @@ class DBConfig:
     database: str
     user: str
     password: str
+    # 连接超时与 TCP keepalive（libpq 参数），避免网络异常时连接长时间挂起
+    connect_timeout: int = 10
+    keepalives_idle: int = 30
+    keepalives_interval: int = 10
+    keepalives_count: int = 5
 
     def get_connection_string(self):
         """获取脱敏的连接字符串（用于日志）"""
@@ -63,6 +256,16 @@ class DBConfig:
             password=getpass.getpass("密码: ")  # 安全输入，不显示明文
         )
 
+    def get_connect_options(self):
+        """获取连接超时与 keepalive 相关的 libpq 参数"""
+        return {
+            'connect_timeout': self.connect_timeout,
+            'keepalives': 1,
+            'keepalives_idle': self.keepalives_idle,
+            'keepalives_interval': self.keepalives_interval,
+            'keepalives_count': self.keepalives_count
+        }
+
     def get_safe_dict(self):
         """获取安全的字典（不含密码，用于显示）"""
         return {
@@ -85,8 +288,14 @@ class DatabaseManager:
             config: 数据库配置，如果为 None 则从环境变量或提示用户输入
         """
         self.config = config
+        self.pool = None
+        # 管理连接：用于架构初始化和直接查询，数据读写走连接池
         self.connection = None
         self.cursor = None
+        # 待写入的解析日志（批量写入 parse_logs）
+        self._log_buf: List[tuple] = []
+        # begin() 开启的显式事务（按线程区分，其他线程仍按调用提交）
+        self._txn = threading.local()
 
     def connect(self) -> bool:
         """连接数据库"""
@@ -102,15 +311,8 @@ class DatabaseManager:
 
             print(f"\n正在连接数据库: {self.config.get_connection_string()}")
 
-            self.connection = psycopg2.connect(
-                host=self.config.host,
-                port=self.config.port,
-                database=self.config.database,
-                user=self.config.user,
-                password=self.config.password,
-                cursor_factory=RealDictCursor
-            )
-
+            self.pool = self._create_pool()
+            self.connection = self.pool.getconn()
             self.cursor = self.connection.cursor()
 
             # 测试连接
@@ -125,14 +327,123 @@ class DatabaseManager:
             print(f"[FAIL] 数据库连接失败: {e}")
             return False
 
+    def _create_pool(self) -> ThreadedConnectionPool:
+        """创建连接池，连接失败（OperationalError）时按指数退避重试"""
+        for attempt in range(CONNECT_RETRIES):
+            try:
+                return ThreadedConnectionPool(
+                    POOL_MIN_CONNECTIONS,
+                    POOL_MAX_CONNECTIONS,
+                    host=self.config.host,
+                    port=self.config.port,
+                    database=self.config.database,
+                    user=self.config.user,
+                    password=self.config.password,
+                    cursor_factory=RealDictCursor,
+                    connection_factory=PreparedConnection,
+                    **self.config.get_connect_options()
+                )
+            except psycopg2.OperationalError as e:
+                if attempt == CONNECT_RETRIES - 1:
+                    raise
+                wait_time = 2 ** attempt
+                print(f"  [WARN] 连接失败: {e}，{wait_time} 秒后重试...")
+                time.sleep(wait_time)
+
     def disconnect(self):
         """断开数据库连接"""
+        if self.pool:
+            self._flush_logs()
         if self.cursor:
             self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        if self.pool:
+            self.pool.closeall()
         print("\n[OK] 数据库连接已关闭")
 
+    @contextmanager
+    def _connection(self, prepared: bool = False):
+        """
+        从连接池借出一个连接并返回游标，正常结束时提交，异常时回滚
+
+        Args:
+            prepared: 是否需要 _PREPARED_STATEMENTS 中的预备语句（写入路径使用）
+        """
+        conn = getattr(self._txn, 'conn', None)
+        if conn is not None:
+            # 显式事务中：共用事务连接，不单独提交；每次调用包在保存点中，失败只撤销本次调用
+            with conn.cursor() as cur:
+                cur.execute("SAVEPOINT dm_call")
+                try:
+                    yield cur
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT dm_call")
+                    raise
+                cur.execute("RELEASE SAVEPOINT dm_call")
+            return
+
+        conn = self.pool.getconn()
+        try:
+            if prepared and not conn.statements_prepared:
+                self._prepare_statements(conn)
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def begin(self) -> None:
+        """
+        开启显式事务：之后本线程的写入共用一个连接，直到 commit() / rollback() 才一次性提交
+
+        单个调用失败时只回滚该调用（保存点），事务本身仍可继续使用。
+        """
+        if getattr(self._txn, 'conn', None) is not None:
+            return
+        conn = self.pool.getconn()
+        # 预备语句在事务开始前准备好（_prepare_statements 会提交）
+        if not conn.statements_prepared:
+            self._prepare_statements(conn)
+        self._txn.conn = conn
+
+    def commit(self) -> bool:
+        """提交 begin() 开启的事务"""
+        conn = getattr(self._txn, 'conn', None)
+        if conn is None:
+            return True
+        self._txn.conn = None
+        try:
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"[ERROR] 提交事务失败: {e}")
+            conn.rollback()
+            return False
+        finally:
+            self.pool.putconn(conn)
+
+    def rollback(self) -> None:
+        """回滚 begin() 开启的事务"""
+        conn = getattr(self._txn, 'conn', None)
+        if conn is None:
+            return
+        self._txn.conn = None
+        try:
+            conn.rollback()
+        finally:
+            self.pool.putconn(conn)
+
+    def _prepare_statements(self, conn) -> None:
+        """在连接上 PREPARE 常用写入语句（每个会话一次，之后只需 EXECUTE）"""
+        with conn.cursor() as cur:
+            cur.execute(';'.join(
+                f"PREPARE {name} AS {sql}" for name, sql in _PREPARED_STATEMENTS.items()
+            ))
+        conn.commit()
+        conn.statements_prepared = True
+
     def initialize_schema(self, schema_file: Optional[str] = None) -> bool:
         """
         初始化数据库架构
@@ -178,116 +489,244 @@ class DatabaseManager:
             解析结果 ID
         """
         try:
-            import hashlib
-
-            # 1. 插入或获取设备元数据
-            self.cursor.execute("""
-                INSERT INTO device_metadata (vendor, device_type, model, software_version, config_format)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (vendor, device_type, model, software_version)
-                DO UPDATE SET updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-            """, (
-                parse_data.get('metadata', {}).get('vendor'),
-                parse_data.get('metadata', {}).get('device_type'),
-                parse_data.get('metadata', {}).get('model'),
-                parse_data.get('metadata', {}).get('software_version'),
-                parse_data.get('metadata', {}).get('config_format')
-            ))
-            device_metadata_id = self.cursor.fetchone()['id']
-
-            # 2. 插入配置文件记录
-            file_content = config_file_info.get('content', '')
-            file_hash = hashlib.md5(file_content.encode()).hexdigest() if file_content else ''
-
-            self.cursor.execute("""
-                INSERT INTO config_files
-                (file_name, file_path, file_hash, file_size, content, content_preview,
-                 identified_device_id, is_parsed, parse_status, uploaded_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (file_hash) DO UPDATE SET
-                    parsed_at = EXCLUDED.parsed_at,
-                    parse_status = EXCLUDED.parse_status
-                RETURNING id
-            """, (
-                config_file_info.get('file_name'),
-                config_file_info.get('file_path'),
-                file_hash,
-                len(file_content),
-                file_content,
-                file_content[:1000] if file_content else None,
-                device_metadata_id,
-                True,  # is_parsed
-                config_file_info.get('parse_status', 'success'),
-                datetime.now()
-            ))
-            config_file_id = self.cursor.fetchone()['id']
-
-            # 3. 插入解析结果
-            self.cursor.execute("""
-                INSERT INTO parse_results
-                (config_file_id, device_metadata_id, quality_score, validation_status,
-                 validation_warnings, validation_errors, parsed_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                config_file_id,
-                device_metadata_id,
-                parse_data.get('quality_score', 0.0),
-                parse_data.get('is_valid', 'unknown'),
-                parse_data.get('warnings', []),
-                parse_data.get('errors', []),
-                datetime.now()
-            ))
-            parse_result_id = self.cursor.fetchone()['id']
-
-            # 4. 插入设备基础信息
+            metadata = parse_data.get('metadata', {})
             device_info = parse_data.get('device_info', {})
-            self.cursor.execute("""
-                INSERT INTO device_info
-                (parse_result_id, hostname, management_ip, mac_address, serial_number,
-                 hostname_valid, management_ip_valid, mac_address_valid)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                parse_result_id,
-                device_info.get('hostname'),
-                device_info.get('management_ip'),
-                device_info.get('mac_address'),
-                device_info.get('serial_number'),
-                device_info.get('hostname_valid'),
-                device_info.get('management_ip_valid'),
-                device_info.get('mac_address_valid')
-            ))
-
-            # 5. 插入接口配置
             interfaces = parse_data.get('interfaces', [])
-            for interface in interfaces:
-                self.cursor.execute("""
-                    INSERT INTO interface_config
-                    (parse_result_id, interface_name, interface_type, ip_address, subnet_mask,
-                     description, status, vlan_id, vlan_name)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    parse_result_id,
-                    interface.get('name'),
-                    None,  # interface_type
-                    interface.get('ip_address'),
-                    interface.get('subnet_mask'),
-                    interface.get('description'),
-                    interface.get('status'),
-                    None,  # vlan_id
-                    None   # vlan_name
+
+            file_content = config_file_info.get('content', '')
+            file_hash = compute_file_hash(file_content)
+            stored_content, stored_zstd = _encode_content(file_content)
+            now = datetime.now()
+
+            # 接口数量很大时改走 COPY，CTE 中只传空数组
+            use_copy = len(interfaces) >= COPY_THRESHOLD
+            if use_copy:
+                interface_arrays = ([], [], [], [], [])
+            else:
+                interface_arrays = (
+                    [interface.get('name') for interface in interfaces],
+                    [interface.get('ip_address') for interface in interfaces],
+                    [interface.get('subnet_mask') for interface in interfaces],
+                    [interface.get('description') for interface in interfaces],
+                    [interface.get('status') for interface in interfaces],
+                )
+
+            with self._connection(prepared=True) as cur:
+                # 一次往返完成全部写入（见 _PREPARED_STATEMENTS['save_parse_result']）
+                cur.execute("EXECUTE save_parse_result (" + ", ".join(["%s"] * 30) + ")", (
+                    # 1. 设备元数据
+                    metadata.get('vendor'),
+                    metadata.get('device_type'),
+                    metadata.get('model'),
+                    metadata.get('software_version'),
+                    metadata.get('config_format'),
+                    # 2. 配置文件记录
+                    config_file_info.get('file_name'),
+                    config_file_info.get('file_path'),
+                    file_hash,
+                    len(file_content),
+                    stored_content,
+                    file_content[:1000] if file_content else None,
+                    config_file_info.get('parse_status', 'success'),
+                    now,
+                    # 3. 解析结果（警告/错误列为 TEXT[]，按文本数组传入，不使用 Json 适配）
+                    parse_data.get('quality_score', 0.0),
+                    parse_data.get('is_valid', 'unknown'),
+                    [str(w) for w in parse_data.get('warnings', [])],
+                    [str(e) for e in parse_data.get('errors', [])],
+                    # 4. 设备基础信息
+                    device_info.get('hostname'),
+                    device_info.get('management_ip'),
+                    device_info.get('mac_address'),
+                    device_info.get('serial_number'),
+                    device_info.get('hostname_valid'),
+                    device_info.get('management_ip_valid'),
+                    device_info.get('mac_address_valid'),
+                    # 5. 接口配置（并行数组）
+                    *interface_arrays,
+                    # 2. 配置文件记录（续）：压缩后的配置内容
+                    stored_zstd
                 ))
+                parse_result_id = cur.fetchone()['id']
+
+                if use_copy:
+                    columns = ('parse_result_id', 'interface_name', 'interface_type', 'ip_address',
+                               'subnet_mask', 'description', 'status', 'vlan_id', 'vlan_name')
+                    rows = [(
+                        parse_result_id,
+                        interface.get('name'),
+                        None,  # interface_type
+                        interface.get('ip_address'),
+                        interface.get('subnet_mask'),
+                        interface.get('description'),
+                        interface.get('status'),
+                        None,  # vlan_id
+                        None   # vlan_name
+                    ) for interface in interfaces]
+                    self._copy_rows(cur, 'interface_config', columns, rows)
 
-            self.connection.commit()
             print(f"[OK] 解析结果已保存到数据库 (ID: {parse_result_id})")
             return parse_result_id
 
         except Exception as e:
             print(f"[ERROR] 保存解析结果失败: {e}")
-            self.connection.rollback()
             return 0
 
+    def save_parse_results_bulk(self, items: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[int]:
+        """
+        在一个事务中批量保存多个解析结果（每张表一次 execute_values 往返）
+
+        Args:
+            items: [(配置文件信息, 解析出的数据)]，每项与 save_parse_result 的参数相同
+
+        Returns:
+            与 items 顺序一致的解析结果 ID 列表；失败时返回空列表
+        """
+        if not items:
+            return []
+
+        try:
+            now = datetime.now()
+            rows = []
+            for config_file_info, parse_data in items:
+                metadata = parse_data.get('metadata', {})
+                file_content = config_file_info.get('content', '')
+                rows.append((
+                    config_file_info,
+                    parse_data,
+                    tuple(metadata.get(key) for key in _METADATA_KEY_FIELDS),
+                    file_content,
+                    compute_file_hash(file_content)
+                ))
+
+            # 同一条 INSERT ... ON CONFLICT DO UPDATE 不能两次更新同一行，冲突键先在批内去重
+            metadata_rows = {}
+            for _, parse_data, metadata_key, _, _ in rows:
+                metadata_rows.setdefault(
+                    metadata_key, (*metadata_key, parse_data.get('metadata', {}).get('config_format')))
+
+            with self._connection() as cur:
+                # 1. 设备元数据
+                returned = execute_values(cur, """
+                    INSERT INTO device_metadata (vendor, device_type, model, software_version, config_format)
+                    VALUES %s
+                    ON CONFLICT (vendor, device_type, model, software_version)
+                    DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+                    RETURNING id, vendor, device_type, model, software_version
+                """, list(metadata_rows.values()), page_size=len(metadata_rows), fetch=True)
+                metadata_ids = {
+                    tuple(row[key] for key in _METADATA_KEY_FIELDS): row['id'] for row in returned
+                }
+
+                # 2. 配置文件记录（同一文件在批内重复出现时以最后一次为准）
+                file_rows = {}
+                for config_file_info, _, metadata_key, file_content, file_hash in rows:
+                    file_rows[file_hash] = (
+                        config_file_info.get('file_name'),
+                        config_file_info.get('file_path'),
+                        file_hash,
+                        len(file_content),
+                        *_encode_content(file_content),
+                        file_content[:1000] if file_content else None,
+                        metadata_ids[metadata_key],
+                        True,
+                        config_file_info.get('parse_status', 'success'),
+                        now
+                    )
+                returned = execute_values(cur, """
+                    INSERT INTO config_files
+                    (file_name, file_path, file_hash, file_size, content, content_zstd, content_preview,
+                     identified_device_id, is_parsed, parse_status, uploaded_at)
+                    VALUES %s
+                    ON CONFLICT (file_hash) DO UPDATE SET
+                        parsed_at = EXCLUDED.parsed_at,
+                        parse_status = EXCLUDED.parse_status
+                    RETURNING id, file_hash
+                """, list(file_rows.values()), page_size=len(file_rows), fetch=True)
+                file_ids = {row['file_hash']: row['id'] for row in returned}
+
+                # 3. 解析结果：PostgreSQL 不保证 RETURNING 按 VALUES 顺序返回，且 config_file_id
+                #    在批内可能重复，无法据此回连；因此先从序列预分配 ID，按下标显式写入
+                cur.execute("""
+                    SELECT nextval(pg_get_serial_sequence('parse_results', 'id')) AS id
+                    FROM generate_series(1, %s)
+                """, (len(rows),))
+                parse_result_ids = sorted(row['id'] for row in cur.fetchall())
+
+                execute_values(cur, """
+                    INSERT INTO parse_results
+                    (id, config_file_id, device_metadata_id, quality_score, validation_status,
+                     validation_warnings, validation_errors, parsed_at)
+                    VALUES %s
+                """, [(
+                    parse_result_id,
+                    file_ids[file_hash],
+                    metadata_ids[metadata_key],
+                    parse_data.get('quality_score', 0.0),
+                    parse_data.get('is_valid', 'unknown'),
+                    [str(w) for w in parse_data.get('warnings', [])],
+                    [str(e) for e in parse_data.get('errors', [])],
+                    now
+                ) for parse_result_id, (_, parse_data, metadata_key, _, file_hash)
+                    in zip(parse_result_ids, rows)], page_size=len(rows))
+
+                # 4. 设备基础信息
+                device_rows = []
+                interface_rows = []
+                for parse_result_id, (_, parse_data, _, _, _) in zip(parse_result_ids, rows):
+                    device_info = parse_data.get('device_info', {})
+                    device_rows.append((
+                        parse_result_id,
+                        device_info.get('hostname'),
+                        device_info.get('management_ip'),
+                        device_info.get('mac_address'),
+                        device_info.get('serial_number'),
+                        device_info.get('hostname_valid'),
+                        device_info.get('management_ip_valid'),
+                        device_info.get('mac_address_valid')
+                    ))
+                    interface_rows.extend((
+                        parse_result_id,
+                        interface.get('name'),
+                        interface.get('ip_address'),
+                        interface.get('subnet_mask'),
+                        interface.get('description'),
+                        interface.get('status')
+                    ) for interface in parse_data.get('interfaces', []))
+
+                execute_values(cur, """
+                    INSERT INTO device_info
+                    (parse_result_id, hostname, management_ip, mac_address, serial_number,
+                     hostname_valid, management_ip_valid, mac_address_valid)
+                    VALUES %s
+                """, device_rows, page_size=len(device_rows))
+
+                # 5. 接口配置（行数很大时改走 COPY）
+                if len(interface_rows) >= COPY_THRESHOLD:
+                    self._copy_rows(cur, 'interface_config', _BULK_INTERFACE_COLUMNS, interface_rows)
+                elif interface_rows:
+                    execute_values(
+                        cur,
+                        f"INSERT INTO interface_config ({', '.join(_BULK_INTERFACE_COLUMNS)}) VALUES %s",
+                        interface_rows, page_size=len(interface_rows)
+                    )
+
+            print(f"[OK] {len(parse_result_ids)} 个解析结果已批量保存到数据库")
+            return parse_result_ids
+
+        except Exception as e:
+            print(f"[ERROR] 批量保存解析结果失败: {e}")
+            return []
+
+    def _copy_rows(self, cur, table: str, columns: tuple, rows: List[tuple]) -> None:
+        """使用 COPY FROM STDIN 批量写入（文本格式，NULL 与空字符串可区分）"""
+        buf = io.StringIO()
+        for row in rows:
+            buf.write('\t'.join(_copy_field(value) for value in row))
+            buf.write('\n')
+        buf.seek(0)
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
     def save_parsing_rule(self, rule_data: Dict[str, Any]) -> int:
         """
         保存解析规则到数据库
@@ -299,75 +738,42 @@ class DatabaseManager:
             规则 ID
         """
         try:
-            # 先获取或创建设备元数据
             metadata = rule_data.get('metadata', {})
-            self.cursor.execute("""
-                INSERT INTO device_metadata (vendor, device_type, model, software_version, config_format)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (vendor, device_type, model, software_version)
-                DO UPDATE SET updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-            """, (
-                metadata.get('vendor'),
-                metadata.get('device_type'),
-                metadata.get('model'),
-                metadata.get('software_version'),
-                metadata.get('config_format')
-            ))
-            device_metadata_id = self.cursor.fetchone()['id']
-
-            # 插入解析规则
             patterns = rule_data.get('patterns', {})
+
+            names, categories, regexes, descriptions = [], [], [], []
             for rule_name, pattern in patterns.items():
                 category = self._infer_category_from_rule_name(rule_name)
-
-                self.cursor.execute("""
-                    INSERT INTO parsing_rules
-                    (rule_name, rule_category, device_metadata_id, regex_pattern,
-                     pattern_description, priority, is_active)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (rule_name) DO UPDATE SET
-                        regex_pattern = EXCLUDED.regex_pattern,
-                        updated_at = CURRENT_TIMESTAMP
-                    RETURNING id
-                """, (
-                    rule_name,
-                    category,
-                    device_metadata_id,
-                    pattern,
-                    f"自动生成的 {category} 解析规则",
-                    0,  # priority
-                    True  # is_active
+                names.append(rule_name)
+                categories.append(category)
+                regexes.append(pattern)
+                descriptions.append(f"自动生成的 {category} 解析规则")
+
+            with self._connection(prepared=True) as cur:
+                # 设备元数据与全部规则一次往返写入
+                cur.execute("EXECUTE save_parsing_rule (%s, %s, %s, %s, %s, %s, %s, %s, %s)", (
+                    metadata.get('vendor'),
+                    metadata.get('device_type'),
+                    metadata.get('model'),
+                    metadata.get('software_version'),
+                    metadata.get('config_format'),
+                    names,
+                    categories,
+                    regexes,
+                    descriptions
                 ))
+                device_metadata_id = cur.fetchone()['id']
 
-            self.connection.commit()
             print(f"[OK] 解析规则已保存到数据库")
             return device_metadata_id
 
         except Exception as e:
             print(f"[ERROR] 保存解析规则失败: {e}")
-            self.connection.rollback()
             return 0
 
     def _infer_category_from_rule_name(self, rule_name: str) -> str:
         """从规则名称推断类别"""
-        rule_lower = rule_name.lower()
-        if 'hostname' in rule_lower:
-            return 'hostname'
-        elif 'interface' in rule_lower:
-            return 'interface'
-        elif 'vlan' in rule_lower:
-            return 'vlan'
-        elif 'ip' in rule_lower or 'address' in rule_lower:
-            return 'ip_address'
-        elif 'mac' in rule_lower:
-            return 'mac_address'
-        elif 'serial' in rule_lower:
-            return 'serial_number'
-        elif 'description' in rule_lower:
-            return 'description'
-        else:
-            return 'general'
+        return _infer_rule_category(rule_name)
 
     def load_parsing_rules(self, vendor: str, device_type: str) -> List[Dict[str, Any]]:
         """
@@ -381,17 +787,20 @@ class DatabaseManager:
             规则列表
         """
         try:
-            self.cursor.execute("""
-                SELECT pr.rule_name, pr.rule_category, pr.regex_pattern,
-                       pr.priority, pr.is_active, pr.success_rate
-                FROM parsing_rules pr
-                JOIN device_metadata dm ON pr.device_metadata_id = dm.id
-                WHERE dm.vendor = %s AND dm.device_type = %s AND pr.is_active = true
-                ORDER BY pr.priority, pr.rule_name
-            """, (vendor, device_type))
+            with self._connection() as cur:
+                cur.execute("""
+                    SELECT pr.rule_name, pr.rule_category, pr.regex_pattern,
+                           pr.priority, pr.is_active, pr.success_rate
+                    FROM parsing_rules pr
+                    JOIN device_metadata dm ON pr.device_metadata_id = dm.id
+                    WHERE dm.vendor = %s AND dm.device_type = %s AND pr.is_active = true
+                    ORDER BY pr.priority, pr.rule_name
+                """, (vendor, device_type))
+
+                rows = cur.fetchall()
 
             rules = []
-            for row in self.cursor.fetchall():
+            for row in rows:
                 rules.append({
                     'rule_name': row['rule_name'],
                     'category': row['rule_category'],
@@ -408,61 +817,130 @@ class DatabaseManager:
 
     def log_parse_event(self, config_file_id: int, level: str, message: str,
                         details: Optional[Dict] = None, duration_ms: Optional[int] = None):
-        """记录解析日志"""
+        """
+        记录解析日志
+
+        日志先写入内存缓冲，达到 LOG_FLUSH_THRESHOLD 条或断开连接时批量写入数据库
+        """
+        self._log_buf.append((
+            config_file_id,
+            level,
+            message,
+            _dumps(details) if details else None,
+            duration_ms
+        ))
+        if len(self._log_buf) >= LOG_FLUSH_THRESHOLD:
+            self._flush_logs()
+
+    def _flush_logs(self):
+        """将缓冲的解析日志一次性写入 parse_logs"""
+        if not self._log_buf:
+            return
+
+        rows, self._log_buf = self._log_buf, []
         try:
-            self.cursor.execute("""
-                INSERT INTO parse_logs
-                (config_file_id, log_level, log_message, log_details, parse_duration_ms)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (
-                config_file_id,
-                level,
-                message,
-                json.dumps(details) if details else None,
-                duration_ms
-            ))
-            self.connection.commit()
+            with self._connection() as cur:
+                execute_values(cur, """
+                    INSERT INTO parse_logs
+                    (config_file_id, log_level, log_message, log_details, parse_duration_ms)
+                    VALUES %s
+                """, rows, page_size=1000)
+
+        except Exception as e:
+            print(f"[ERROR] 记录日志失败（{len(rows)} 条）: {e}")
+
+    def get_config_content(self, file_hash: str) -> Optional[str]:
+        """
+        读取已保存的配置内容（content_zstd 有值时解压）
+
+        Args:
+            file_hash: 配置内容哈希（compute_file_hash）
+
+        Returns:
+            配置内容；不存在或读取失败时返回 None
+        """
+        try:
+            with self._connection() as cur:
+                cur.execute(
+                    "SELECT content, content_zstd FROM config_files WHERE file_hash = %s",
+                    (file_hash,)
+                )
+                row = cur.fetchone()
+
+            if row is None:
+                return None
+            if row['content_zstd'] is None:
+                return row['content']
+            if zstandard is None:
+                raise RuntimeError("配置内容以 zstd 压缩存储，需要安装 zstandard")
+            return zstandard.ZstdDecompressor().decompress(bytes(row['content_zstd'])).decode('utf-8')
+
+        except Exception as e:
+            print(f"[ERROR] 读取配置内容失败: {e}")
+            return None
+
+    def get_parse_summary(self, limit: int = PARSE_SUMMARY_LIMIT) -> List[Dict[str, Any]]:
+        """
+        按文件名列出解析结果摘要（v_parse_results_summary 视图）
+
+        Args:
+            limit: 最多返回的行数
+
+        Returns:
+            摘要行列表；失败时返回空列表
+        """
+        return list(self.iter_parse_summary(limit))
+
+    def iter_parse_summary(self, limit: int = PARSE_SUMMARY_LIMIT) -> Iterator[Dict[str, Any]]:
+        """
+        逐行产出解析结果摘要（服务端游标分批读取，客户端内存占用与结果行数无关）
+
+        Args:
+            limit: 最多产出的行数
+        """
+        try:
+            with self._connection() as cur:
+                with cur.connection.cursor(name='parse_summary') as summary_cur:
+                    summary_cur.itersize = SUMMARY_ITERSIZE
+                    summary_cur.execute("""
+                        SELECT file_name, vendor, device_type, hostname, quality_score, validation_status
+                        FROM v_parse_results_summary
+                        ORDER BY file_name
+                        LIMIT %s
+                    """, (limit,))
+                    yield from summary_cur
 
         except Exception as e:
-            print(f"[ERROR] 记录日志失败: {e}")
+            print(f"[ERROR] 查询解析结果摘要失败: {e}")
 
     def get_parse_statistics(self) -> Dict[str, Any]:
-        """获取解析统计信息"""
+        """获取解析统计信息（一次查询同时返回平均质量分数、状态分布和厂商分布）"""
         try:
-            # 配置文件统计
-            self.cursor.execute("SELECT COUNT(*) as total FROM config_files")
-            total_files = self.cursor.fetchone()['total']
-
-            # 按状态统计
-            self.cursor.execute("""
-                SELECT parse_status, COUNT(*) as count
-                FROM config_files
-                GROUP BY parse_status
-            """)
-            status_stats = {row['parse_status']: row['count'] for row in self.cursor.fetchall()}
-
-            # 平均质量分数
-            self.cursor.execute("""
-                SELECT AVG(quality_score) as avg_quality
-                FROM parse_results
-            """)
-            avg_quality = self.cursor.fetchone()['avg_quality']
-
-            # 厂商分布
-            self.cursor.execute("""
-                SELECT vendor, COUNT(*) as count
-                FROM device_metadata dm
-                JOIN config_files cf ON cf.identified_device_id = dm.id
-                GROUP BY vendor
-                ORDER BY count DESC
-            """)
-            vendor_dist = {row['vendor']: row['count'] for row in self.cursor.fetchall()}
+            with self._connection() as cur:
+                # 分布以 [键, 计数] 数组聚合（parse_status 可能为 NULL，不能直接作为 JSON 对象的键）
+                cur.execute("""
+                    SELECT
+                        (SELECT AVG(quality_score) FROM parse_results) AS avg_quality,
+                        (SELECT json_agg(json_build_array(parse_status, count))
+                         FROM (SELECT parse_status, COUNT(*) AS count
+                               FROM config_files
+                               GROUP BY parse_status) s) AS status_dist,
+                        (SELECT json_agg(json_build_array(vendor, count) ORDER BY count DESC)
+                         FROM (SELECT vendor, COUNT(*) AS count
+                               FROM device_metadata dm
+                               JOIN config_files cf ON cf.identified_device_id = dm.id
+                               GROUP BY vendor) v) AS vendor_dist
+                """)
+                row = cur.fetchone()
+
+            status_stats = dict(row['status_dist'] or [])
+            avg_quality = row['avg_quality']
 
             return {
-                'total_files': total_files,
+                'total_files': sum(status_stats.values()),
                 'status_distribution': status_stats,
                 'average_quality_score': float(avg_quality) if avg_quality else 0.0,
-                'vendor_distribution': vendor_dist
+                'vendor_distribution': dict(row['vendor_dist'] or [])
             }
 
         except Exception as e:
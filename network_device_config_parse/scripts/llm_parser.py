@@ -7,192 +7,48 @@ LLM-based Config Parser - 基于大语言模型的配置解析器
 import os
 import json
 import re
+import hashlib
 import time
+import asyncio
+import threading
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import requests
 from datetime import datetime
 
+# 可选：异步并发调用依赖 httpx
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # 自动加载.env文件
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / '.env')
 
+# JSON 解码：优先使用 orjson（未安装时回退到标准库 json）
+try:
+    import orjson
 
-@dataclass
-class LLMConfig:
-    """LLM配置"""
-    api_key: str
-    base_url: str = "https://open.bigmodel.cn/api/paas/v4/"
-    model: str = "glm-4-plus"  # 使用最强大的模型
-    temperature: float = 0.1  # 降低随机性，提高准确性
-    max_tokens: int = 8000
-
-    @classmethod
-    def from_env(cls):
-        """从环境变量加载配置"""
-        return cls(
-            api_key=os.getenv('ZHIPUAI_API_KEY', ''),
-            model=os.getenv('ZHIPUAI_MODEL', 'glm-4-plus')
-        )
-
-
-class LLMConfigParser:
-    """基于LLM的配置解析器"""
-
-    def __init__(self, config: Optional[LLMConfig] = None):
-        """
-        初始化LLM解析器
-
-        Args:
-            config: LLM配置，如果为None则从环境变量加载
-        """
-        self.config = config or LLMConfig.from_env()
-        self.api_url = f"{self.config.base_url}chat/completions"
-
-    def call_llm(self, prompt: str, system_prompt: Optional[str] = None, max_retries: int = 3) -> str:
-        """
-        调用智谱AI API（带重试机制）
-
-        Args:
-            prompt: 用户提示词
-            system_prompt: 系统提示词（可选）
-            max_retries: 最大重试次数
-
-        Returns:
-            模型响应文本
-        """
-        if not self.config.api_key:
-            raise ValueError("ZHIPUAI_API_KEY environment variable not set")
-
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json"
-        }
-
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-
-        payload = {
-            "model": self.config.model,
-            "messages": messages,
-            "temperature": self.config.temperature,
-            "max_tokens": self.config.max_tokens
-        }
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-        for retry in range(max_retries):
-            try:
-                # 添加请求间隔，避免速率限制
-                if retry > 0:
-                    wait_time = 2 ** retry  # 指数退避：2, 4, 8秒
-                    print(f"  [重试 {retry}/{max_retries}] 等待 {wait_time} 秒后重试...")
-                    time.sleep(wait_time)
-                else:
-                    time.sleep(1)  # 第一次请求前等待1秒
+# 异步批量解析时的默认并发上限
+DEFAULT_LLM_CONCURRENCY = 8
 
-                response = requests.post(self.api_url, headers=headers, json=payload, timeout=60)
+# 从LLM响应中提取 ```json 代码块
+_JSON_FENCE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
 
-                # 检查是否是速率限制错误
-                if response.status_code == 429:
-                    if retry < max_retries - 1:
-                        wait_time = 5  # 速率限制时等待5秒
-                        print(f"  [WARN] API速率限制，等待 {wait_time} 秒后重试...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        raise Exception(f"API速率限制，已达到最大重试次数 ({max_retries})")
-
-                response.raise_for_status()
-
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-
-            except requests.exceptions.RequestException as e:
-                if retry == max_retries - 1:
-                    raise Exception(f"LLM API调用失败（已重试{max_retries}次）: {e}")
-                print(f"  [WARN] 请求失败: {e}，正在重试...")
-
-        raise Exception(f"LLM API调用失败: 达到最大重试次数")
-
-    def extract_json_from_response(self, response: str) -> Dict[str, Any]:
-        """
-        从LLM响应中提取JSON数据
-
-        Args:
-            response: LLM响应文本
-
-        Returns:
-            解析出的JSON数据
-        """
-        # 尝试直接解析
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            pass
-
-        # 尝试提取JSON代码块
-        json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                pass
-
-        # 尝试提取花括号内容
-        brace_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if brace_match:
-            try:
-                return json.loads(brace_match.group(0))
-            except json.JSONDecodeError:
-                pass
-
-        raise ValueError(f"无法从响应中提取有效的JSON: {response[:200]}...")
-
-    def parse_config(self, config_text: str, prompt_template: str,
-                     output_schema: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        使用LLM解析配置文件
-
-        Args:
-            config_text: 配置文件内容
-            prompt_template: 提示词模板
-            output_schema: 输出schema（用于验证）
-
-        Returns:
-            解析结果（结构化数据）
-        """
-        # 构建完整提示词
-        prompt = prompt_template.replace("{{CONFIG}}", config_text)
-
-        # 添加JSON输出要求
-        prompt += "\n\n请以JSON格式返回结果，严格按照提供的schema结构。"
-
-        # 调用LLM
-        system_prompt = """你是一个专业的网络设备配置分析专家。
+# 解析用系统提示词
+_SYSTEM_PROMPT = """你是一个专业的网络设备配置分析专家。
 你精通各大厂商（Cisco、Huawei、H3C、Juniper等）的设备配置语法。
 你的任务是分析网络设备配置文件，提取结构化的配置信息。
 请准确、完整地提取信息，如果某个配置项不存在，请返回null或空数组。"""
 
-        response = self.call_llm(prompt, system_prompt)
-
-        # 提取JSON结果
-        result = self.extract_json_from_response(response)
-
-        return result
-
-    def identify_device(self, config_text: str) -> Dict[str, Any]:
-        """
-        识别设备元数据
-
-        Args:
-            config_text: 配置文件内容
-
-        Returns:
-            设备元数据
-        """
-        prompt = """分析以下网络设备配置文件，识别设备的基本信息。
+# 设备识别提示词（{{CONFIG}} 由 parse_config 替换为配置内容）
+_IDENTIFY_DEVICE_PROMPT = """分析以下网络设备配置文件，识别设备的基本信息。
 
 配置文件：
 ```
@@ -216,26 +72,12 @@ class LLMConfigParser:
 3. 提供准确的识别依据
 """
 
-        return self.parse_config(config_text, prompt, {})
-
-    def extract_full_config(self, config_text: str, vendor: str,
-                           device_type: str) -> Dict[str, Any]:
-        """
-        提取完整配置信息
-
-        Args:
-            config_text: 配置文件内容
-            vendor: 厂商
-            device_type: 设备类型
-
-        Returns:
-            完整的配置信息
-        """
-        prompt = f"""深度分析以下{vendor} {device_type}的配置文件，提取所有关键配置信息。
+# 完整配置提取提示词模板（format 填入 vendor / device_type 后得到含 {{CONFIG}} 的提示词）
+_FULL_CONFIG_PROMPT_TEMPLATE = """深度分析以下{vendor} {device_type}的配置文件，提取所有关键配置信息。
 
 配置文件：
 ```
-{{CONFIG}}
+{{{{CONFIG}}}}
 ```
 
 请提取以下信息并以JSON格式返回：
@@ -413,8 +255,366 @@ class LLMConfigParser:
 5. 特别注意路由协议、VLAN、安全配置等关键信息
 """
 
+
+@dataclass
+class LLMConfig:
+    """LLM配置"""
+    api_key: str
+    base_url: str = "https://open.bigmodel.cn/api/paas/v4/"
+    model: str = "glm-4-plus"  # 使用最强大的模型
+    temperature: float = 0.1  # 降低随机性，提高准确性
+    max_tokens: int = 8000
+
+    @classmethod
+    def from_env(cls):
+        """从环境变量加载配置"""
+        return cls(
+            api_key=os.getenv('ZHIPUAI_API_KEY', ''),
+            model=os.getenv('ZHIPUAI_MODEL', 'glm-4-plus')
+        )
+
+
+class LLMConfigParser:
+    """基于LLM的配置解析器"""
+
+    def __init__(self, config: Optional[LLMConfig] = None):
+        """
+        初始化LLM解析器
+
+        Args:
+            config: LLM配置，如果为None则从环境变量加载
+        """
+        self.config = config or LLMConfig.from_env()
+        self.api_url = f"{self.config.base_url}chat/completions"
+
+        # 设备识别结果缓存（内容哈希 -> 元数据）
+        self._identify_cache: Dict[str, Dict[str, Any]] = {}
+
+        # 每个线程复用各自的 HTTP 会话（keep-alive）：requests.Session 不保证线程安全，
+        # 同一解析器可能被多个工作线程同时调用
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+
+    def _session(self) -> requests.Session:
+        """当前线程的 HTTP 会话（首次调用时创建）"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {self.config.api_key}",
+                "Content-Type": "application/json"
+            })
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """关闭所有线程的 HTTP 会话"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def _build_payload(self, prompt: str, system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """构建 chat/completions 请求体"""
+        if not self.config.api_key:
+            raise ValueError("ZHIPUAI_API_KEY environment variable not set")
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        return {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens
+        }
+
+    def call_llm(self, prompt: str, system_prompt: Optional[str] = None, max_retries: int = 3) -> str:
+        """
+        调用智谱AI API（带重试机制）
+
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            max_retries: 最大重试次数
+
+        Returns:
+            模型响应文本
+        """
+        payload = self._build_payload(prompt, system_prompt)
+
+        for retry in range(max_retries):
+            try:
+                # 添加请求间隔，避免速率限制
+                if retry > 0:
+                    wait_time = 2 ** retry  # 指数退避：2, 4, 8秒
+                    print(f"  [重试 {retry}/{max_retries}] 等待 {wait_time} 秒后重试...")
+                    time.sleep(wait_time)
+                else:
+                    time.sleep(1)  # 第一次请求前等待1秒
+
+                response = self._session().post(self.api_url, json=payload, timeout=60)
+
+                # 检查是否是速率限制错误
+                if response.status_code == 429:
+                    if retry < max_retries - 1:
+                        wait_time = 5  # 速率限制时等待5秒
+                        print(f"  [WARN] API速率限制，等待 {wait_time} 秒后重试...")
+                        time.sleep(wait_time)
+                        continue
+                    else:
+                        raise Exception(f"API速率限制，已达到最大重试次数 ({max_retries})")
+
+                response.raise_for_status()
+
+                result = response.json()
+                return result["choices"][0]["message"]["content"]
+
+            except requests.exceptions.RequestException as e:
+                if retry == max_retries - 1:
+                    raise Exception(f"LLM API调用失败（已重试{max_retries}次）: {e}")
+                print(f"  [WARN] 请求失败: {e}，正在重试...")
+
+        raise Exception(f"LLM API调用失败: 达到最大重试次数")
+
+    def _new_async_client(self) -> "httpx.AsyncClient":
+        """创建异步 HTTP 客户端（需要安装 httpx）"""
+        if httpx is None:
+            raise ImportError("异步调用需要 httpx: pip install httpx")
+        return httpx.AsyncClient(
+            headers={
+                "Authorization": f"Bearer {self.config.api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=60
+        )
+
+    async def call_llm_async(self, client: "httpx.AsyncClient", prompt: str,
+                             system_prompt: Optional[str] = None, max_retries: int = 3) -> str:
+        """
+        异步调用智谱AI API（重试策略与 call_llm 一致）
+
+        Args:
+            client: 共享的 httpx.AsyncClient
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            max_retries: 最大重试次数
+
+        Returns:
+            模型响应文本
+        """
+        payload = self._build_payload(prompt, system_prompt)
+
+        for retry in range(max_retries):
+            try:
+                if retry > 0:
+                    wait_time = 2 ** retry  # 指数退避：2, 4, 8秒
+                    print(f"  [重试 {retry}/{max_retries}] 等待 {wait_time} 秒后重试...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    await asyncio.sleep(1)  # 第一次请求前等待1秒
+
+                response = await client.post(self.api_url, json=payload)
+
+                if response.status_code == 429:
+                    if retry < max_retries - 1:
+                        wait_time = 5
+                        print(f"  [WARN] API速率限制，等待 {wait_time} 秒后重试...")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    else:
+                        raise Exception(f"API速率限制，已达到最大重试次数 ({max_retries})")
+
+                response.raise_for_status()
+
+                result = response.json()
+                return result["choices"][0]["message"]["content"]
+
+            except httpx.HTTPError as e:
+                if retry == max_retries - 1:
+                    raise Exception(f"LLM API调用失败（已重试{max_retries}次）: {e}")
+                print(f"  [WARN] 请求失败: {e}，正在重试...")
+
+        raise Exception(f"LLM API调用失败: 达到最大重试次数")
+
+    def extract_json_from_response(self, response: str) -> Dict[str, Any]:
+        """
+        从LLM响应中提取JSON数据
+
+        Args:
+            response: LLM响应文本
+
+        Returns:
+            解析出的JSON数据
+        """
+        # 尝试直接解析
+        try:
+            return _loads(response)
+        except json.JSONDecodeError:
+            pass
+
+        # 尝试提取花括号内容（首个 '{' 到最后一个 '}'，覆盖绝大多数带说明文字或代码块的响应）
+        start = response.find('{')
+        end = response.rfind('}')
+        if start != -1 and end > start:
+            try:
+                return _loads(response[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+
+        # 尝试提取JSON代码块（响应中含多段花括号内容时）
+        json_match = _JSON_FENCE.search(response)
+        if json_match:
+            try:
+                return _loads(json_match.group(1))
+            except json.JSONDecodeError:
+                pass
+
+        raise ValueError(f"无法从响应中提取有效的JSON: {response[:200]}...")
+
+    def _build_parse_prompt(self, config_text: str, prompt_template: str) -> tuple[str, str]:
+        """构建解析用的 (用户提示词, 系统提示词)"""
+        # 构建完整提示词
+        prompt = prompt_template.replace("{{CONFIG}}", config_text)
+
+        # 添加JSON输出要求
+        prompt += "\n\n请以JSON格式返回结果，严格按照提供的schema结构。"
+
+        system_prompt = _SYSTEM_PROMPT
+
+        return prompt, system_prompt
+
+    def parse_config(self, config_text: str, prompt_template: str,
+                     output_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        使用LLM解析配置文件
+
+        Args:
+            config_text: 配置文件内容
+            prompt_template: 提示词模板
+            output_schema: 输出schema（用于验证）
+
+        Returns:
+            解析结果（结构化数据）
+        """
+        prompt, system_prompt = self._build_parse_prompt(config_text, prompt_template)
+
+        # 调用LLM
+        response = self.call_llm(prompt, system_prompt)
+
+        # 提取JSON结果
+        result = self.extract_json_from_response(response)
+
+        return result
+
+    def identify_device(self, config_text: str) -> Dict[str, Any]:
+        """
+        识别设备元数据
+
+        相同内容的配置只调用一次LLM：结果按内容哈希缓存在进程内。
+        不复用数据库中的 device_metadata —— 那是正则解析器写入的识别结果，
+        复用会让 LLM 与正则的对比退化为正则与自身比较。
+
+        Args:
+            config_text: 配置文件内容
+
+        Returns:
+            设备元数据
+        """
+        key = self._content_hash(config_text)
+        metadata = self._identify_cache.get(key)
+        if metadata is None:
+            metadata = self.parse_config(config_text, _IDENTIFY_DEVICE_PROMPT, {})
+            self._identify_cache[key] = metadata
+        return dict(metadata)
+
+    @staticmethod
+    def _content_hash(config_text: str) -> str:
+        """配置内容哈希（识别结果缓存键）"""
+        return hashlib.blake2b(config_text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def extract_full_config(self, config_text: str, vendor: str,
+                           device_type: str) -> Dict[str, Any]:
+        """
+        提取完整配置信息
+
+        Args:
+            config_text: 配置文件内容
+            vendor: 厂商
+            device_type: 设备类型
+
+        Returns:
+            完整的配置信息
+        """
+        prompt = _FULL_CONFIG_PROMPT_TEMPLATE.format(vendor=vendor, device_type=device_type)
         return self.parse_config(config_text, prompt, {})
 
+    async def parse_config_async(self, client: "httpx.AsyncClient", config_text: str,
+                                 prompt_template: str) -> Dict[str, Any]:
+        """parse_config 的异步版本"""
+        prompt, system_prompt = self._build_parse_prompt(config_text, prompt_template)
+        response = await self.call_llm_async(client, prompt, system_prompt)
+        return self.extract_json_from_response(response)
+
+    async def identify_device_async(self, client: "httpx.AsyncClient",
+                                    config_text: str) -> Dict[str, Any]:
+        """identify_device 的异步版本"""
+        key = self._content_hash(config_text)
+        metadata = self._identify_cache.get(key)
+        if metadata is None:
+            metadata = await self.parse_config_async(client, config_text, _IDENTIFY_DEVICE_PROMPT)
+            self._identify_cache[key] = metadata
+        return dict(metadata)
+
+    async def extract_full_config_async(self, client: "httpx.AsyncClient", config_text: str,
+                                        vendor: str, device_type: str) -> Dict[str, Any]:
+        """extract_full_config 的异步版本"""
+        return await self.parse_config_async(
+            client, config_text, _FULL_CONFIG_PROMPT_TEMPLATE.format(vendor=vendor, device_type=device_type)
+        )
+
+    async def analyze_configs_async(self, config_texts: List[str],
+                                    concurrency: int = DEFAULT_LLM_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        并发解析多个配置文件（识别设备 + 提取完整配置）
+
+        Args:
+            config_texts: 配置文件内容列表
+            concurrency: 同时进行中的文件数上限
+
+        Returns:
+            与输入顺序一致的结果列表，每项包含 metadata / full_config，
+            失败的文件包含 error
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def process(client, config_text):
+            async with sem:
+                try:
+                    metadata = await self.identify_device_async(client, config_text)
+                    full_config = await self.extract_full_config_async(
+                        client, config_text,
+                        metadata.get('vendor', 'Unknown'),
+                        metadata.get('device_type', 'Unknown')
+                    )
+                    return {'metadata': metadata, 'full_config': full_config}
+                except Exception as e:
+                    return {'error': str(e)}
+
+        async with self._new_async_client() as client:
+            return await asyncio.gather(*[process(client, text) for text in config_texts])
+
+    def analyze_configs(self, config_texts: List[str],
+                        concurrency: int = DEFAULT_LLM_CONCURRENCY) -> List[Dict[str, Any]]:
+        """analyze_configs_async 的同步封装"""
+        return asyncio.run(self.analyze_configs_async(config_texts, concurrency))
+
     def validate_extracted_data(self, data: Dict[str, Any]) -> tuple[bool, float, List[str]]:
         """
         验证提取的数据质量
@@ -426,53 +626,47 @@ class LLMConfigParser:
             (是否有效, 质量分数, 警告列表)
         """
         warnings = []
-        scores = []
+        quality_score = 0.0
 
         # 检查设备基础信息
         device_info = data.get('device_info', {})
         if device_info.get('hostname'):
-            scores.append(0.2)
+            quality_score += 0.2
         else:
             warnings.append("Missing hostname")
 
         if device_info.get('management_ip'):
-            scores.append(0.1)
+            quality_score += 0.1
         else:
             warnings.append("Missing management IP")
 
-        # 检查接口配置
+        # 检查接口配置（基础分 + 每个有名称和IP的接口 0.05）
         interfaces = data.get('interfaces', [])
         if interfaces:
-            scores.append(0.2)
-            for iface in interfaces:
-                if iface.get('name') and iface.get('ip_address'):
-                    scores.append(0.05)
+            valid_count = sum(1 for iface in interfaces
+                              if iface.get('name') and iface.get('ip_address'))
+            quality_score += 0.2 + 0.05 * valid_count
         else:
             warnings.append("No interfaces found")
 
         # 检查路由配置
-        routing = data.get('routing', {})
-        if any(routing.values()):
-            scores.append(0.15)
+        if any(data.get('routing', {}).values()):
+            quality_score += 0.15
         else:
             warnings.append("No routing configuration found")
 
         # 检查VLAN配置（如果是交换机）
-        vlans = data.get('vlans', [])
-        if vlans:
-            scores.append(0.1)
+        if data.get('vlans', []):
+            quality_score += 0.1
 
         # 检查安全配置
-        security = data.get('security', {})
-        if any(security.values()):
-            scores.append(0.1)
+        if any(data.get('security', {}).values()):
+            quality_score += 0.1
 
         # 检查服务配置
-        services = data.get('services', {})
-        if any(services.values()):
-            scores.append(0.1)
+        if any(data.get('services', {}).values()):
+            quality_score += 0.1
 
-        quality_score = sum(scores) if scores else 0.0
         is_valid = quality_score >= 0.6
 
         return is_valid, quality_score, warnings
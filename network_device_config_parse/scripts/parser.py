@@ -4,16 +4,410 @@ Network Device Config Parser - 网络设备配置文件解析器
 支持多厂商网络设备配置文件的自动识别、提取、校验
 """
 
+import os
 import re
+import sys
+import mmap
 import json
+import time
+import hashlib
 import yaml
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from types import MappingProxyType
+from typing import Callable, Dict, List, Any, Iterable, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
 
+# 可选：Aho-Corasick 多模式字符串匹配（未安装时使用正则联合扫描）
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 可选：Hyperscan 多模式正则引擎（未安装时逐条规则使用 re 扫描）
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# 可选：RE2 线性时间正则引擎（未安装时使用 re），用于路由配置候选行扫描
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# JSON 导出：优先使用 orjson（未安装时回退到标准库 json），均输出 2 空格缩进的 UTF-8 字节
+try:
+    import orjson
+
+    def _dumps_indented(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dumps_indented(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# 优先使用 libyaml 的 C 实现读写规则文件（PyYAML 未编译 libyaml 时回退到纯 Python 实现）
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+# 超过此大小的配置文件通过 mmap 读取（直接从页缓存解码，不额外复制一份字节）
+MMAP_THRESHOLD = 1 << 20
+
+# parse_many 每次分发给工作进程的文件数上限
+PARSE_MANY_CHUNKSIZE = 16
+
+# 数据类使用 __slots__（Python 3.10+ 支持 dataclass(slots=True)，更早版本保持普通数据类）
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# 正则元字符（不含这些字符的关键字按纯字符串匹配）
+_REGEX_METACHARS = frozenset('\\.^$*+?{}[]|()')
+
+# 用户规则数达到该值才使用 Hyperscan 预筛选（规则少时编译开销远大于逐条 re 扫描）
+HYPERSCAN_MIN_RULES = 50
+
+# 进程内缓存的 Hyperscan 规则数据库数量上限
+HYPERSCAN_DB_CACHE_SIZE = 16
+
+# 用户规则预筛选的 Hyperscan 编译选项：每条规则只报告一次命中；
+# PREFILTER 允许近似编译反向引用等不支持的语法（只会多报，不会漏报）
+_HS_RULE_FLAGS = 0
+if hyperscan is not None:
+    _HS_RULE_FLAGS = (hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_SINGLEMATCH |
+                      hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_ALLOWEMPTY |
+                      hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+
+
+class _CompiledRules:
+    """模块加载时一次性编译的内置正则（flags 已内置）"""
+
+    # 厂商特征：厂商 -> [(正则, 配置格式)]
+    VENDOR = {
+        'Cisco': [
+            (re.compile(r'^(hostname|interface\s+\S+|vlan\s+\d+)', re.MULTILINE), 'Cisco IOS'),
+            (re.compile(r'^(version\s+15|version\s+12)', re.MULTILINE), 'Cisco IOS'),
+        ],
+        'Huawei': [
+            (re.compile(r'^(sysname|interface\s+\S+|vlan\s+\d+)', re.MULTILINE), 'Huawei VRP'),
+            (re.compile(r'^\s*#\s*$', re.MULTILINE), 'Huawei VRP'),
+        ],
+        'H3C': [
+            (re.compile(r'^(sysname|interface\s+\S+)', re.MULTILINE), 'H3C Comware'),
+        ],
+        'Juniper': [
+            (re.compile(r'^(set\system\shostname|interfaces\s+\S+)', re.MULTILINE), 'Juniper JunOS'),
+        ],
+        'Ruijie': [
+            (re.compile(r'^(hostname|interface\s+\S+)', re.MULTILINE), 'Ruijie OS'),
+        ]
+    }
+
+    # 软件版本
+    VERSION = MappingProxyType({
+        'Cisco': re.compile(r'version\s+([\d.()]+)'),
+        'Huawei': re.compile(r'version\s+([\d.]+)'),
+        'H3C': re.compile(r'version\s+([\d.]+)'),
+        'Juniper': re.compile(r'Junos:\s+([\d.]+)'),
+    })
+
+    # 设备类型关键字（匹配小写配置文本，按类型优先级排列）
+    TYPE_KEYWORDS = {
+        'Router': ['router', 'serial', 'WAN'],
+        'Switch': ['switch', 'vlan', 'trunk', r'interface\s+GigabitEthernet'],
+        'Firewall': ['firewall', 'security-zone', 'policy'],
+        'Load Balancer': ['load-balance', 'slb', 'serverfarm']
+    }
+
+    # 型号（简化版）
+    MODEL = [
+        re.compile(r'Catalyst\s+(\S+)', re.IGNORECASE),
+        re.compile(r'NE\d+E?', re.IGNORECASE),
+        re.compile(r'S\d+', re.IGNORECASE),
+        re.compile(r'MX\d+', re.IGNORECASE),
+        re.compile(r'SRG\d+', re.IGNORECASE)
+    ]
+
+    # 设备基础信息
+    HOSTNAME = MappingProxyType({
+        'Cisco': re.compile(r'hostname\s+(\S+)'),
+        'Huawei': re.compile(r'sysname\s+(\S+)'),
+        'H3C': re.compile(r'sysname\s+(\S+)'),
+        'Juniper': re.compile(r'set\system\shostname\s+"?(\S+)"?'),
+        'Ruijie': re.compile(r'hostname\s+(\S+)')
+    })
+    MAC = re.compile(r'([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}|'
+                     r'([0-9A-Fa-f]{2}\.){5}[0-9A-Fa-f]{2}|'
+                     r'([0-9A-Fa-f]{4}\.){2}[0-9A-Fa-f]{4}')
+    SERIAL = re.compile(r'System\s+[Ss]erial\s+[Nn]umber\s*:\s*(\S+)|'
+                        r'Processor\s+board ID\s+(\S+)', re.IGNORECASE)
+    MGMT_IP = re.compile(r'ip\s+address\s+(\d+\.\d+\.\d+\.\d+)')
+
+    # 接口配置
+    # 接口块起始行（interface <名称>），按行匹配
+    INTERFACE_HEADER = re.compile(r'interface[ \t]+(\S+)')
+    INTERFACE_VENDORS = frozenset({'Cisco', 'Huawei', 'H3C'})
+    # 字段在同一行内匹配（[^\S\n] 为除换行外的空白）
+    IFACE_IP = re.compile(r'ip[^\S\n]+address[^\S\n]+(\d+\.\d+\.\d+\.\d+)[^\S\n]+(\S+)')
+    IFACE_DESC = re.compile(r'description[^\S\n]+(\S.*)')
+
+    # 路由协议配置块起始行（匹配去掉首尾空白的行）：进程号 / AS 号必须是数字（AS 号可为 asdot 格式），
+    # 以免 "ip ospf cost"、"bgp router-id" 等块内或接口下的命令被当作新的配置块
+    OSPF_ENTRY = re.compile(r'(?:router[ \t]+)?ospf[ \t]+(\d+)(?!\S)', re.IGNORECASE | re.ASCII)
+    BGP_ENTRY = re.compile(r'(?:router[ \t]+)?bgp[ \t]+(\d+(?:\.\d+)?)(?!\S)', re.IGNORECASE | re.ASCII)
+
+    # 顶层配置行（行首非空白）：配置段的起始行，或 '!' / '#' 分隔行
+    TOP_LEVEL_LINE = re.compile(r'^\S[^\n]*', re.MULTILINE)
+    SECTION_SEPARATORS = ('!', '#')
+
+    # optimize_rules 使用的 hostname 候选模式：(规则字符串, 已编译正则)
+    ADAPTIVE_HOSTNAME = [
+        (pattern, re.compile(pattern)) for pattern in (
+            r'hostname\s+(?P<hostname>\S+)',
+            r'sysname\s+(?P<hostname>\S+)',
+            r'set-system-hostname\s+"?(?P<hostname>\S+)"?',
+            r'host-name\s+(?P<hostname>\S+)'
+        )
+    ]
+
+
+# 除换行外的空白字符（即 re 的 [^\S\n]），显式列出以便 RE2 与 re 的匹配结果一致（RE2 的 \s 只含 ASCII 空白）
+_HSPACE_CLASS = '[\t\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]'
+
+# 路由配置（OSPF / BGP）候选行：含协议相关关键字，或可能结束配置块的行；其余行在扫描中直接跳过
+_ROUTING_LINE_PATTERN = (
+    r'(?im)^[^\n]*(?:ospf|bgp|router-id|area|network|neighbor|peer)[^\n]*$'
+    r'|^' + _HSPACE_CLASS + r'*(?:!|interface|router bgp|ip route)[^\n]*$'
+)
+_CompiledRules.ROUTING_LINE = (re2 or re).compile(_ROUTING_LINE_PATTERN)
+
+# 可能是路由协议配置块起始行的行（OSPF_ENTRY / BGP_ENTRY 的宽松版本，用于跳过两个配置块之外的行）
+_CompiledRules.ROUTING_HEADER = re.compile(
+    r'^' + _HSPACE_CLASS + r'*(?:router[ \t]+)?(?:ospf|bgp)[ \t]+\d',
+    re.IGNORECASE | re.ASCII | re.MULTILINE
+)
+
+
+# validate_quality 校验的设备信息必填字段
+_REQUIRED_DEVICE_FIELDS = ('hostname', 'management_ip')
+
+# 公共解析规则（各厂商共用，仅 hostname 规则不同）
+_COMMON_RULES = {
+    'interface': r'interface\s+(?P<interface>\S+)',
+    'ip_address': r'ip\s+address\s+(?P<ip>\d+\.\d+\.\d+\.\d+)\s+(?P<mask>\S+)',
+    'vlan': r'vlan\s+(?P<vlan_id>\d+)',
+    'description': r'description\s+(?P<description>.*)'
+}
+
+# generate_parsing_rules 使用的厂商规则模板（只读，生成时复制一份）
+_RULE_TEMPLATES = MappingProxyType({
+    'Cisco': MappingProxyType({'hostname': r'hostname\s+(?P<hostname>\S+)', **_COMMON_RULES}),
+    'Huawei': MappingProxyType({'hostname': r'sysname\s+(?P<hostname>\S+)', **_COMMON_RULES}),
+})
+
+
+def _is_valid_hostname(hostname: str) -> bool:
+    """主机名：ASCII 字母开头，仅含字母、数字和 '-'，长度 1-63"""
+    if not (0 < len(hostname) <= 63 and hostname.isascii() and hostname[0].isalpha()):
+        return False
+    rest = hostname[1:].replace('-', '')
+    return not rest or rest.isalnum()
+
+
+def _is_valid_ipv4(ip: str) -> bool:
+    """IPv4 点分十进制：4 段，每段 1-3 位数字且不超过 255"""
+    octets = ip.split('.')
+    if len(octets) != 4:
+        return False
+    for octet in octets:
+        if not (0 < len(octet) <= 3 and octet.isdecimal() and int(octet) <= 255):
+            return False
+    return True
+
+
+def _best_priority(union: re.Pattern, text: str) -> Optional[int]:
+    """
+    用联合正则扫描文本，返回命中分组中优先级最高（序号最小）的序号
 
-@dataclass
+    分组命名为 p0, p1, ...；遇到 p0 即提前结束。未命中返回 None。
+    """
+    best = None
+    for match in union.finditer(text):
+        index = int(match.lastgroup[1:])
+        if best is None or index < best:
+            best = index
+            if best == 0:
+                break
+    return best
+
+
+def _build_vendor_union():
+    """
+    将全部厂商特征合并为一个正则，一次扫描完成厂商识别
+
+    每个特征包在零宽先行断言中，finditer 会在每个位置报告优先级最高的命中，
+    且不会因某个特征跨行消耗文本而漏掉后续位置的命中。
+    """
+    order = []
+    branches = []
+    for vendor, patterns in _CompiledRules.VENDOR.items():
+        for pattern, format_name in patterns:
+            branches.append(f'(?=(?P<p{len(order)}>{pattern.pattern}))')
+            order.append((vendor, format_name))
+    return re.compile('|'.join(branches), re.MULTILINE), order
+
+
+def _build_type_scanner():
+    """
+    构建设备类型关键字扫描器
+
+    返回 (类型列表, 正则联合扫描器, Aho-Corasick 自动机或 None, [(序号, 正则关键字)])。
+    正则联合扫描器使用 IGNORECASE | ASCII 直接扫描原始配置文本，无需生成小写副本
+    （ASCII 使 ſ 等非 ASCII 字符不被视为关键字字母的大小写形式，与 lower() 后匹配一致）；
+    自动机只能做精确匹配，仍扫描小写文本。纯字符串关键字放入自动机一次扫描完成；
+    含正则元字符的关键字单独编译，仅在可能得到更高优先级时才检查。
+    """
+    order = list(_CompiledRules.TYPE_KEYWORDS)
+    # 关键字匹配的是小写文本，含大写字母的关键字（如 'WAN'）永远不会命中，构建时直接忽略
+    keyword_groups = [
+        [keyword for keyword in keywords if keyword == keyword.lower()]
+        for keywords in _CompiledRules.TYPE_KEYWORDS.values()
+    ]
+    union = re.compile('|'.join(
+        f'(?=(?P<p{index}>{"|".join(keywords)}))'
+        for index, keywords in enumerate(keyword_groups) if keywords
+    ), re.IGNORECASE | re.ASCII)
+
+    automaton = None
+    regex_keywords = []
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for index, keywords in enumerate(keyword_groups):
+            for keyword in keywords:
+                if _REGEX_METACHARS.isdisjoint(keyword):
+                    # 同一关键字出现在多个类型时保留优先级最高者
+                    if keyword not in automaton:
+                        automaton.add_word(keyword, index)
+                else:
+                    regex_keywords.append((index, re.compile(keyword)))
+        automaton.make_automaton()
+
+    return order, union, automaton, regex_keywords
+
+
+def _build_device_info_scanner(vendor: str):
+    """
+    将 hostname（按厂商）、MAC、序列号、管理 IP 四个模式合并为一个联合正则
+
+    联合正则只负责一次扫描找出候选位置，各字段仍用原模式在该位置 match，
+    因此每个字段取到的仍是其原模式 search 的第一个命中。
+    """
+    fields = []
+    hostname = _CompiledRules.HOSTNAME.get(vendor)
+    if hostname is not None:
+        fields.append(('hostname', hostname))
+    fields += [
+        ('mac_address', _CompiledRules.MAC),
+        ('serial_number', _CompiledRules.SERIAL),
+        ('management_ip', _CompiledRules.MGMT_IP),
+    ]
+
+    branches = []
+    for field, pattern in fields:
+        body = pattern.pattern
+        if pattern.flags & re.IGNORECASE:
+            body = f'(?i:{body})'
+        branches.append(f'(?={body})')
+    return re.compile('|'.join(branches)), fields
+
+
+# 厂商特征联合正则，以及 分组序号 -> (厂商, 配置格式)（序号即优先级）
+_CompiledRules.VENDOR_UNION, _CompiledRules.VENDOR_ORDER = _build_vendor_union()
+
+# 设备类型扫描器
+(_CompiledRules.TYPE_ORDER, _CompiledRules.TYPE_UNION,
+ _CompiledRules.TYPE_AUTOMATON, _CompiledRules.TYPE_REGEX) = _build_type_scanner()
+
+# 设备基础信息扫描器：厂商 -> (联合正则, [(字段名, 正则)])，'' 为无 hostname 规则的默认项
+_CompiledRules.DEVICE_INFO = {
+    vendor: _build_device_info_scanner(vendor)
+    for vendor in ('', *_CompiledRules.HOSTNAME)
+}
+
+# hostname 候选模式的联合正则（分组序号即候选顺序；命名分组改为非捕获分组以免重名）
+_CompiledRules.ADAPTIVE_HOSTNAME_UNION = re.compile('|'.join(
+    f'(?=(?P<p{index}>{re.sub(r"[(][?]P<[^>]+>", "(?:", pattern)}))'
+    for index, (pattern, _) in enumerate(_CompiledRules.ADAPTIVE_HOSTNAME)
+))
+
+
+def _build_hyperscan_db(patterns: Tuple[str, ...]):
+    """将全部用户规则编译为一个 Hyperscan 块模式数据库（规则序号即 pattern id）"""
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[pattern.encode('utf-8') for pattern in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[_HS_RULE_FLAGS] * len(patterns)
+    )
+    return database
+
+
+# 进程内共享的 Hyperscan 数据库：(规则字符串, flags) 元组 -> 数据库（编译失败记为 None）
+_HS_DB_CACHE: Dict[Tuple[Tuple[str, int], ...], Any] = {}
+
+
+def _hs_cache_key(patterns: Tuple[str, ...]) -> Tuple[Tuple[str, int], ...]:
+    return tuple((pattern, _HS_RULE_FLAGS) for pattern in patterns)
+
+
+def _hs_cache_put(key: Tuple[Tuple[str, int], ...], database) -> None:
+    """写入共享缓存；超过上限时淘汰最早写入的条目"""
+    if key not in _HS_DB_CACHE and len(_HS_DB_CACHE) >= HYPERSCAN_DB_CACHE_SIZE:
+        del _HS_DB_CACHE[next(iter(_HS_DB_CACHE))]
+    _HS_DB_CACHE[key] = database
+
+
+def _shared_hyperscan_db(patterns: Tuple[str, ...]):
+    """返回规则集对应的 Hyperscan 数据库；同一规则集在进程内只编译一次"""
+    key = _hs_cache_key(patterns)
+    if key in _HS_DB_CACHE:
+        return _HS_DB_CACHE[key]
+    try:
+        database = _build_hyperscan_db(patterns)
+    except Exception as e:
+        print(f"Hyperscan compile failed, falling back to re: {e}")
+        database = None
+    _hs_cache_put(key, database)
+    return database
+
+
+def _rules_sha256(rules: Dict[str, str]) -> str:
+    """规则集指纹（与字段顺序无关）：规则文件与 Hyperscan 缓存以此判断是否对应同一组规则"""
+    return hashlib.sha256(json.dumps(sorted(rules.items())).encode('utf-8')).hexdigest()
+
+
+def _match_device_type(config_lower: str) -> Optional[int]:
+    """用 Aho-Corasick 自动机扫描小写配置文本，返回优先级最高的设备类型序号（未命中返回 None）"""
+    best = None
+    for _, index in _CompiledRules.TYPE_AUTOMATON.iter(config_lower):
+        if best is None or index < best:
+            best = index
+            if best == 0:
+                return best
+
+    # 正则关键字只需检查优先级高于当前结果的类型
+    for index, pattern in _CompiledRules.TYPE_REGEX:
+        if best is not None and index >= best:
+            break
+        if pattern.search(config_lower):
+            return index
+    return best
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class DeviceMetadata:
     """设备元数据"""
     vendor: str = ""
@@ -22,8 +416,12 @@ class DeviceMetadata:
     software_version: str = ""
     config_format: str = ""
 
+    def to_dict(self) -> Dict[str, str]:
+        """转换为字典（字段均为字符串，直接读取即可，无需 asdict 的递归深拷贝）"""
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class DeviceInfo:
     """设备基础信息"""
     hostname: str = ""
@@ -31,33 +429,133 @@ class DeviceInfo:
     mac_address: str = ""
     serial_number: str = ""
 
+    def to_dict(self) -> Dict[str, str]:
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
 
-@dataclass
+
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
 class InterfaceInfo:
-    """接口信息"""
+    """接口信息（不可变：实际数据按列存放在 NetworkConfigParser.interface_cols 中）"""
     name: str = ""
     ip_address: str = ""
     subnet_mask: str = ""
     status: str = ""
     description: str = ""
 
+    def to_dict(self) -> Dict[str, str]:
+        """转换为字典"""
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
+
+
+# 接口信息字段（InterfaceInfo 字段顺序，即 interface_cols 的列顺序）
+_INTERFACE_FIELDS = tuple(InterfaceInfo.__dataclass_fields__)
+
 
 class NetworkConfigParser:
     """网络设备配置解析器"""
 
     def __init__(self, rules_dir: Optional[Path] = None):
         self.rules_dir = rules_dir or Path(__file__).parent.parent / 'rules'
+        # 已编译的用户规则缓存：(规则字符串, flags) -> 正则
+        self._compiled_rules: Dict[Tuple[str, int], re.Pattern] = {}
+        # 用户规则的 Hyperscan 数据库，及其按 pattern id 排列的 (字段名, 规则字符串)
+        self._hs_db = None
+        self._hs_rules: Tuple[Tuple[str, str], ...] = ()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空当前设备的解析状态，以便同一个解析器继续解析下一个配置文件（保留已编译的规则缓存）"""
         self.metadata = DeviceMetadata()
         self.device_info = DeviceInfo()
-        self.interfaces: List[InterfaceInfo] = []
+        # 接口信息按字段列存储：字段名 -> 各接口该字段的值（顺序一致）
+        self.interface_cols: Dict[str, List[str]] = {field: [] for field in _INTERFACE_FIELDS}
+        self._interfaces_view: Optional[Tuple[InterfaceInfo, ...]] = None
+        # 路由配置：协议名 -> 提取结果（未配置时为 None）
+        self.routing: Dict[str, Optional[Dict[str, Any]]] = {'ospf': None, 'bgp': None}
         self.raw_config = ""
         self.parsing_rules = {}
+        # 小写配置文本缓存及其对应的 raw_config 对象
+        self._lower_config = ""
+        self._lower_source: Optional[str] = None
+        # 顶层配置段索引缓存及其对应的 raw_config 对象
+        self._sections: List[Tuple[str, int, int]] = []
+        self._sections_source: Optional[str] = None
+        # 厂商已清空，恢复为通用提取函数
+        self._select_extractors()
+
+    @property
+    def interfaces(self) -> Tuple[InterfaceInfo, ...]:
+        """
+        接口信息（由 interface_cols 按需重建并缓存）
+
+        返回不可变的元组视图，修改接口请整体赋值 self.interfaces = [...]。
+        """
+        if self._interfaces_view is None:
+            self._interfaces_view = tuple(
+                InterfaceInfo(*row) for row in zip(*self.interface_cols.values())
+            )
+        return self._interfaces_view
+
+    @interfaces.setter
+    def interfaces(self, interfaces: Iterable[InterfaceInfo]) -> None:
+        interfaces = tuple(interfaces)
+        self.interface_cols = {
+            field: [getattr(interface, field) for interface in interfaces]
+            for field in _INTERFACE_FIELDS
+        }
+        self._interfaces_view = None
+
+    def _interface_dicts(self) -> List[Dict[str, str]]:
+        """按列直接生成接口字典列表（不经过 InterfaceInfo 对象）"""
+        return [dict(zip(_INTERFACE_FIELDS, row)) for row in zip(*self.interface_cols.values())]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """pickle 时去掉 Hyperscan 数据库和厂商提取函数（均不可序列化），反序列化后重新生成"""
+        state = self.__dict__.copy()
+        state['_hs_db'] = None
+        state['_hs_rules'] = ()
+        del state['_extractors']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """反序列化后按厂商重新选择提取函数"""
+        self.__dict__.update(state)
+        self._select_extractors()
+
+    @classmethod
+    def parse_many(cls, paths: Iterable, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        多进程并行解析多个配置文件
+
+        每个文件在工作进程中独立完成 识别 -> 提取 -> 校验，结果顺序与输入一致。
+        workers 默认为 CPU 核数；只有一个文件或 workers=1 时在当前进程中解析。
+        """
+        parse_one = partial(_parse_config_file, parser_class=cls)
+        paths = [str(path) for path in paths]
+        if len(paths) <= 1 or workers == 1:
+            return [parse_one(path) for path in paths]
+
+        workers = workers or os.cpu_count() or 1
+        # 文件较少时减小分块，保证每个工作进程都能分到任务
+        chunksize = max(1, min(PARSE_MANY_CHUNKSIZE, len(paths) // (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(parse_one, paths, chunksize=chunksize))
 
     def load_config(self, config_file: str) -> bool:
         """加载配置文件"""
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self.raw_config = f.read()
+            if os.path.getsize(config_file) < MMAP_THRESHOLD:
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    self.raw_config = f.read()
+            else:
+                with open(config_file, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    text = str(mm, 'utf-8')
+                # 与文本模式读取一致：统一换行符
+                if '\r' in text:
+                    text = text.replace('\r\n', '\n').replace('\r', '\n')
+                self.raw_config = text
             return True
         except Exception as e:
             print(f"Error loading config: {e}")
@@ -69,87 +567,63 @@ class NetworkConfigParser:
 
     def identify_device(self) -> DeviceMetadata:
         """识别设备特征（步骤1）"""
-        # 厂商特征识别
-        vendor_patterns = {
-            'Cisco': [
-                (r'^(hostname|interface\s+\S+|vlan\s+\d+)', 'Cisco IOS'),
-                (r'^(version\s+15|version\s+12)', 'Cisco IOS'),
-            ],
-            'Huawei': [
-                (r'^(sysname|interface\s+\S+|vlan\s+\d+)', 'Huawei VRP'),
-                (r'^\s*#\s*$', 'Huawei VRP'),
-            ],
-            'H3C': [
-                (r'^(sysname|interface\s+\S+)', 'H3C Comware'),
-            ],
-            'Juniper': [
-                (r'^(set\system\shostname|interfaces\s+\S+)', 'Juniper JunOS'),
-            ],
-            'Ruijie': [
-                (r'^(hostname|interface\s+\S+)', 'Ruijie OS'),
-            ]
-        }
+        # 厂商特征识别：单次扫描，取命中的优先级最高（序号最小）的特征
+        best = _best_priority(_CompiledRules.VENDOR_UNION, self.raw_config)
+        if best is None:
+            # 未识别出厂商，返回默认值
+            return self.metadata
+
+        self.metadata.vendor, self.metadata.config_format = _CompiledRules.VENDOR_ORDER[best]
+        self._select_extractors()
 
-        config_lower = self.raw_config.lower()
+        # 提取版本信息
+        self._extract_version()
 
-        for vendor, patterns in vendor_patterns.items():
-            for pattern, format_name in patterns:
-                if re.search(pattern, self.raw_config, re.MULTILINE):
-                    self.metadata.vendor = vendor
-                    self.metadata.config_format = format_name
+        # 识别设备类型和型号
+        self._identify_device_type()
 
-                    # 提取版本信息
-                    self._extract_version()
+        return self.metadata
 
-                    # 识别设备类型和型号
-                    self._identify_device_type()
+    def _select_extractors(self) -> None:
+        """
+        选择 self.metadata.vendor 对应的厂商提取函数
 
-                    return self.metadata
+        厂商提取函数直接绑定该厂商的预编译正则和规则模板，提取时不再按厂商查表。
+        在设置厂商的 reset / identify_device / load_rules 中调用。
+        """
+        self._extractors = _VENDOR_EXTRACTORS.get(self.metadata.vendor, _GENERIC_EXTRACTORS)
 
-        # 未识别出厂商，返回默认值
-        return self.metadata
+    def _lowered_config(self) -> str:
+        """小写配置文本（按 raw_config 对象缓存，重新加载配置后自动重新生成）"""
+        if self._lower_source is not self.raw_config:
+            self._lower_config = self.raw_config.lower()
+            self._lower_source = self.raw_config
+        return self._lower_config
 
     def _extract_version(self) -> None:
         """提取软件版本"""
-        version_patterns = {
-            'Cisco': r'version\s+([\d.()]+)',
-            'Huawei': r'version\s+([\d.]+)',
-            'H3C': r'version\s+([\d.]+)',
-            'Juniper': r'Junos:\s+([\d.]+)',
-        }
+        self._extractors['version'](self)
 
-        if self.metadata.vendor in version_patterns:
-            match = re.search(version_patterns[self.metadata.vendor], self.raw_config)
+    def _search_version(self, pattern: Optional[re.Pattern]) -> None:
+        """用指定的版本正则提取软件版本"""
+        if pattern:
+            match = pattern.search(self.raw_config)
             if match:
                 self.metadata.software_version = match.group(1)
 
     def _identify_device_type(self) -> None:
         """识别设备类型和型号"""
-        # 根据特征关键字识别
-        type_keywords = {
-            'Router': ['router', 'serial', 'WAN'],
-            'Switch': ['switch', 'vlan', 'trunk', r'interface\s+GigabitEthernet'],
-            'Firewall': ['firewall', 'security-zone', 'policy'],
-            'Load Balancer': ['load-balance', 'slb', 'serverfarm']
-        }
-
-        config_lower = self.raw_config.lower()
-        for device_type, keywords in type_keywords.items():
-            if any(re.search(keyword, config_lower) for keyword in keywords):
-                self.metadata.device_type = device_type
-                break
+        # 根据特征关键字识别：未安装 Aho-Corasick 时忽略大小写直接扫描原文
+        if _CompiledRules.TYPE_AUTOMATON is None:
+            index = _best_priority(_CompiledRules.TYPE_UNION, self.raw_config)
+        else:
+            index = _match_device_type(self._lowered_config())
+        if index is not None:
+            self.metadata.device_type = _CompiledRules.TYPE_ORDER[index]
 
         # 型号识别（简化版）
-        model_patterns = [
-            r'Catalyst\s+(\S+)',
-            r'NE\d+E?',
-            r'S\d+',
-            r'MX\d+',
-            r'SRG\d+'
-        ]
-
-        for pattern in model_patterns:
-            match = re.search(pattern, self.raw_config, re.IGNORECASE)
+        for pattern in _CompiledRules.MODEL:
+            match = pattern.search(self.raw_config)
             if match:
                 self.metadata.model = match.group(0)
                 break
@@ -162,116 +636,207 @@ class NetworkConfigParser:
         # 提取接口配置
         self._extract_interfaces()
 
+        # 提取路由配置
+        self._extract_routing()
+
         # 返回提取的数据
         return {
-            'metadata': asdict(self.metadata),
-            'device_info': asdict(self.device_info),
-            'interfaces': [asdict(i) for i in self.interfaces]
+            'metadata': self.metadata.to_dict(),
+            'device_info': self.device_info.to_dict(),
+            'interfaces': self._interface_dicts(),
+            'routing': dict(self.routing)
         }
 
+    def _extract_routing(self) -> None:
+        """提取 OSPF / BGP 路由配置（两个协议在同一次扫描中完成）"""
+        ospf: Dict[str, Any] = {}
+        bgp: Dict[str, Any] = {}
+        in_ospf_block = False
+        in_bgp_block = False
+
+        # 两个配置块都未打开时，只有配置块起始行会改变状态：直接跳到下一个可能的起始行，
+        # 之后再无起始行则提前结束（不再扫描文件剩余部分）
+        raw = self.raw_config
+        header = _CompiledRules.ROUTING_HEADER.search(raw)
+        while header:
+            for match in _CompiledRules.ROUTING_LINE.finditer(raw, header.start()):
+                line = match.group(0).strip()
+                lower = line.lower()
+                parts = line.split()
+
+                # OSPF：配置块起始行为 router ospf <进程号>（Cisco）或 ospf <进程号>（Huawei/H3C），
+                # 起始行本身也可能带有 router-id 等参数
+                entry = _CompiledRules.OSPF_ENTRY.match(line)
+                if entry:
+                    in_ospf_block = True
+                    ospf['process_id'] = entry.group(1)
+                if in_ospf_block:
+                    if 'router-id' in lower and len(parts) >= 2:
+                        ospf['router_id'] = parts[-1]
+                    if 'area' in lower:
+                        for i, part in enumerate(parts):
+                            if part.lower() == 'area' and i + 1 < len(parts):
+                                ospf['area'] = parts[i + 1]
+                                break
+                    if 'network' in lower and len(parts) >= 4:
+                        ospf.setdefault('networks', []).append(f"{parts[1]}/{parts[3]}")
+                    # 配置块结束（遇到 ! 或其他配置块）
+                    if line == '!' or line.startswith('interface') or line.startswith('router bgp'):
+                        in_ospf_block = False
+
+                # BGP：配置块起始行为 router bgp <AS 号>（Cisco）或 bgp <AS 号>（Huawei/H3C）
+                entry = _CompiledRules.BGP_ENTRY.match(line)
+                if entry:
+                    in_bgp_block = True
+                    bgp['as_number'] = entry.group(1)
+                if in_bgp_block:
+                    if 'router-id' in lower and len(parts) >= 2:
+                        bgp['router_id'] = parts[-1]
+                    if ('neighbor' in lower or 'peer' in lower) and len(parts) >= 3:
+                        for i, part in enumerate(parts):
+                            if part.lower() in ('remote-as', 'as-number') and i + 1 < len(parts):
+                                bgp.setdefault('neighbors', []).append({'ip': parts[1], 'as': parts[i + 1]})
+                                break
+                    if line == '!' or line.startswith('interface') or line.startswith('ip route'):
+                        in_bgp_block = False
+
+                if not (in_ospf_block or in_bgp_block):
+                    header = _CompiledRules.ROUTING_HEADER.search(raw, match.end())
+                    break
+            else:
+                break
+
+        self.routing = {'ospf': ospf or None, 'bgp': bgp or None}
+
     def _extract_device_info(self) -> None:
         """提取设备基础信息"""
-        # Hostname
-        hostname_patterns = {
-            'Cisco': r'hostname\s+(\S+)',
-            'Huawei': r'sysname\s+(\S+)',
-            'H3C': r'sysname\s+(\S+)',
-            'Juniper': r'set\system\shostname\s+"?(\S+)"?',
-            'Ruijie': r'hostname\s+(\S+)'
-        }
+        self._extractors['device_info'](self)
+
+    def _scan_device_info(self, union: re.Pattern, fields: List[Tuple[str, re.Pattern]]) -> None:
+        """用指定的设备基础信息扫描器提取设备基础信息"""
+        raw = self.raw_config
+        pending = dict(fields)
+
+        # 单次扫描：在联合正则的每个候选位置检查尚未命中的字段，全部命中即提前结束
+        for hit in union.finditer(raw):
+            pos = hit.start()
+            for field, pattern in list(pending.items()):
+                match = pattern.match(raw, pos)
+                if not match:
+                    continue
+                del pending[field]
+
+                if field == 'mac_address':
+                    value = match.group(0)
+                elif field == 'serial_number':
+                    value = match.group(1) if match.group(1) else match.group(2)
+                else:
+                    # hostname / 管理 IP（通常是第一个配置的 IP）
+                    value = match.group(1)
+                setattr(self.device_info, field, value)
 
-        if self.metadata.vendor in hostname_patterns:
-            match = re.search(hostname_patterns[self.metadata.vendor], self.raw_config)
-            if match:
-                self.device_info.hostname = match.group(1)
-
-        # MAC 地址
-        mac_pattern = r'([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}|' \
-                     r'([0-9A-Fa-f]{2}\.){5}[0-9A-Fa-f]{2}|' \
-                     r'([0-9A-Fa-f]{4}\.){2}[0-9A-Fa-f]{4}'
-        match = re.search(mac_pattern, self.raw_config)
-        if match:
-            self.device_info.mac_address = match.group(0)
-
-        # 序列号
-        serial_pattern = r'System\s+[Ss]erial\s+[Nn]umber\s*:\s*(\S+)|' \
-                        r'Processor\s+board ID\s+(\S+)'
-        match = re.search(serial_pattern, self.raw_config, re.IGNORECASE)
-        if match:
-            self.device_info.serial_number = match.group(1) if match.group(1) else match.group(2)
-
-        # 管理 IP（通常是第一个配置的 IP）
-        ip_pattern = r'ip\s+address\s+(\d+\.\d+\.\d+\.\d+)'
-        match = re.search(ip_pattern, self.raw_config)
-        if match:
-            self.device_info.management_ip = match.group(1)
+            if not pending:
+                break
+
+    def _section_index(self) -> List[Tuple[str, int, int]]:
+        """
+        顶层配置段索引 [(段首行, 段首行起始偏移, 段结束偏移)]
+
+        单次扫描行首非空白的行：每个这样的行结束上一个配置段，
+        '!' / '#' 分隔行之外的行开始新的配置段。按 raw_config 对象缓存。
+        """
+        if self._sections_source is not self.raw_config:
+            raw = self.raw_config
+            sections = []
+            current = None
+            for match in _CompiledRules.TOP_LEVEL_LINE.finditer(raw):
+                if current is not None:
+                    sections.append((current.group(0), current.start(), match.start()))
+                    current = None
+                if not match.group(0).startswith(_CompiledRules.SECTION_SEPARATORS):
+                    current = match
+            if current is not None:
+                sections.append((current.group(0), current.start(), len(raw)))
+
+            self._sections = sections
+            self._sections_source = raw
+        return self._sections
 
     def _extract_interfaces(self) -> None:
         """提取接口配置"""
-        interface_patterns = {
-            'Cisco': r'interface\s+(\S+)(.*?)(?=interface|\Z)',
-            'Huawei': r'interface\s+(\S+)(.*?)(?=interface|\Z)',
-            'H3C': r'interface\s+(\S+)(.*?)(?=interface|\Z)',
-        }
-
-        if self.metadata.vendor not in interface_patterns:
-            return
+        self._extractors['interfaces'](self)
 
-        pattern = interface_patterns[self.metadata.vendor]
-        matches = re.findall(pattern, self.raw_config, re.DOTALL)
+    def _scan_interfaces(self) -> None:
+        """按顶层配置段索引提取接口配置（不检查厂商）"""
+        # 只在 interface 配置段内查找字段，段范围来自顶层配置段索引
+        raw = self.raw_config
+        cols = self.interface_cols
+        for header, start, end in self._section_index():
+            if not header.startswith('interface'):
+                continue
+            match = _CompiledRules.INTERFACE_HEADER.match(header)
+            if not match:
+                continue
 
-        for match in matches:
-            if isinstance(match, tuple):
-                interface_name = match[0]
-                config_block = match[1] if len(match) > 1 else ''
-            else:
-                interface_name = match
-                config_block = ''
+            # 起始行中接口名之后的部分也属于该接口块
+            config_block = raw[start + match.end():end]
 
-            interface_info = InterfaceInfo(name=interface_name)
+            cols['name'].append(match.group(1))
 
             # 提取 IP 地址
-            ip_match = re.search(r'ip\s+address\s+(\d+\.\d+\.\d+\.\d+)\s+(\S+)', config_block)
-            if ip_match:
-                interface_info.ip_address = ip_match.group(1)
-                interface_info.subnet_mask = ip_match.group(2)
+            ip_match = _CompiledRules.IFACE_IP.search(config_block)
+            cols['ip_address'].append(ip_match.group(1) if ip_match else '')
+            cols['subnet_mask'].append(ip_match.group(2) if ip_match else '')
 
             # 提取描述
-            desc_match = re.search(r'description\s+(\S.*)', config_block)
-            if desc_match:
-                interface_info.description = desc_match.group(1).strip()
+            desc_match = _CompiledRules.IFACE_DESC.search(config_block)
+            cols['description'].append(desc_match.group(1).strip() if desc_match else '')
 
             # 提取状态
             if 'no shutdown' in config_block or 'enable' in config_block:
-                interface_info.status = 'up'
+                cols['status'].append('up')
             elif 'shutdown' in config_block:
-                interface_info.status = 'down'
+                cols['status'].append('down')
+            else:
+                cols['status'].append('')
 
-            self.interfaces.append(interface_info)
+        self._interfaces_view = None
 
     def validate_quality(self, data: Optional[Dict[str, Any]] = None) -> Tuple[bool, float, List[str]]:
         """校验数据质量（步骤3）"""
         if data is None:
-            data = {
-                'device_info': asdict(self.device_info),
-                'interfaces': [asdict(i) for i in self.interfaces]
-            }
+            return self._validate_internal()
 
+        device_info = data.get('device_info', {})
+        interfaces = data.get('interfaces', [])
+        return self._score_quality(
+            [(field, device_info.get(field, '')) for field in _REQUIRED_DEVICE_FIELDS],
+            [(interface.get('name'), interface.get('name', idx), interface.get('ip_address'))
+             for idx, interface in enumerate(interfaces)]
+        )
+
+    def _validate_internal(self) -> Tuple[bool, float, List[str]]:
+        """直接读取已提取的数据类校验数据质量（不构建中间字典）"""
+        return self._score_quality(
+            [(field, getattr(self.device_info, field)) for field in _REQUIRED_DEVICE_FIELDS],
+            [(name, name, ip_address) for name, ip_address
+             in zip(self.interface_cols['name'], self.interface_cols['ip_address'])]
+        )
+
+    def _score_quality(self, device_fields: List[Tuple[str, Any]],
+                       interfaces: List[Tuple[Any, Any, Any]]) -> Tuple[bool, float, List[str]]:
+        """
+        计算质量分数
+
+        device_fields 为 [(字段名, 值)]，interfaces 为 [(接口名, 告警中的接口标识, IP 地址)]。
+        """
         warnings = []
         filled_fields = 0
         total_fields = 0
 
-        # 校验必填字段
-        required_fields = {
-            'device_info': ['hostname', 'management_ip'],
-            'interfaces': ['name']
-        }
-
         # 校验设备信息
-        device_info = data.get('device_info', {})
-        for field in required_fields.get('device_info', []):
+        for field, value in device_fields:
             total_fields += 1
-            value = device_info.get(field, '')
 
             if not value or value.strip() == '':
                 warnings.append(f"Missing required field: device_info.{field}")
@@ -291,19 +856,18 @@ class NetworkConfigParser:
                     filled_fields += 1
 
         # 校验接口信息
-        interfaces = data.get('interfaces', [])
         total_fields += len(interfaces)  # 每个接口至少需要 name
-        for idx, interface in enumerate(interfaces):
-            if not interface.get('name'):
+        for idx, (name, label, ip_address) in enumerate(interfaces):
+            if not name:
                 warnings.append(f"Interface {idx}: Missing interface name")
             else:
                 filled_fields += 1
 
             # 校验接口 IP（如果存在）
-            if interface.get('ip_address'):
+            if ip_address:
                 total_fields += 1
-                if not self._validate_ip(interface['ip_address']):
-                    warnings.append(f"Interface {interface.get('name', idx)}: Invalid IP address")
+                if not self._validate_ip(ip_address):
+                    warnings.append(f"Interface {label}: Invalid IP address")
                 else:
                     filled_fields += 1
 
@@ -315,40 +879,22 @@ class NetworkConfigParser:
 
     def _validate_hostname(self, hostname: str) -> bool:
         """校验主机名格式"""
-        pattern = r'^[a-zA-Z][a-zA-Z0-9\-]{0,62}$'
-        return bool(re.match(pattern, hostname))
+        return _is_valid_hostname(hostname)
 
     def _validate_ip(self, ip: str) -> bool:
         """校验 IP 地址格式"""
-        pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-        if not re.match(pattern, ip):
-            return False
-        # 检查每个段是否在 0-255 范围内
-        octets = ip.split('.')
-        return all(0 <= int(octet) <= 255 for octet in octets)
+        return _is_valid_ipv4(ip)
 
     def generate_parsing_rules(self) -> Dict[str, str]:
         """生成解析正则表达式（步骤4）"""
-        rules = {}
-
         # 根据厂商和配置格式生成规则
-        if self.metadata.vendor == 'Cisco':
-            rules.update({
-                'hostname': r'hostname\s+(?P<hostname>\S+)',
-                'interface': r'interface\s+(?P<interface>\S+)',
-                'ip_address': r'ip\s+address\s+(?P<ip>\d+\.\d+\.\d+\.\d+)\s+(?P<mask>\S+)',
-                'vlan': r'vlan\s+(?P<vlan_id>\d+)',
-                'description': r'description\s+(?P<description>.*)'
-            })
-        elif self.metadata.vendor == 'Huawei':
-            rules.update({
-                'hostname': r'sysname\s+(?P<hostname>\S+)',
-                'interface': r'interface\s+(?P<interface>\S+)',
-                'ip_address': r'ip\s+address\s+(?P<ip>\d+\.\d+\.\d+\.\d+)\s+(?P<mask>\S+)',
-                'vlan': r'vlan\s+(?P<vlan_id>\d+)',
-                'description': r'description\s+(?P<description>.*)'
-            })
+        return self._extractors['parsing_rules'](self)
+
+    def _use_rule_template(self, template) -> Dict[str, str]:
+        """以规则模板的副本作为当前解析规则"""
+        rules = dict(template)
 
+        # Hyperscan 数据库在首次预筛选或保存缓存时才编译（_hyperscan_db），只取规则字典的调用方无需承担编译开销
         self.parsing_rules = rules
         return rules
 
@@ -368,15 +914,20 @@ class NetworkConfigParser:
             rule_path.parent.mkdir(parents=True, exist_ok=True)
 
             # 保存规则
+            patterns_sha256 = _rules_sha256(self.parsing_rules)
             rule_data = {
-                'metadata': asdict(self.metadata),
+                'metadata': self.metadata.to_dict(),
                 'patterns': self.parsing_rules,
+                'patterns_sha256': patterns_sha256,
                 'created_at': datetime.now().isoformat(),
                 'version': '1.0.0'
             }
 
             with open(rule_path, 'w', encoding='utf-8') as f:
-                yaml.dump(rule_data, f, default_flow_style=False, allow_unicode=True)
+                yaml.dump(rule_data, f, Dumper=_SafeDumper, default_flow_style=False, allow_unicode=True)
+
+            # 编译好的 Hyperscan 数据库与 YAML 并排保存，加载时无需重新编译
+            self._save_hyperscan_cache(rule_path, patterns_sha256)
 
             print(f"Rules saved to: {rule_path}")
             return True
@@ -394,12 +945,24 @@ class NetworkConfigParser:
                 print(f"Rule file not found: {rule_path}")
                 return False
 
+            start = time.perf_counter()
             with open(rule_path, 'r', encoding='utf-8') as f:
-                rule_data = yaml.safe_load(f)
+                rule_data = yaml.load(f, Loader=_SafeLoader)
 
             self.parsing_rules = rule_data.get('patterns', {})
             self.metadata = DeviceMetadata(**rule_data.get('metadata', {}))
+            self._select_extractors()
+
+            # 优先加载预编译的 Hyperscan 缓存；缓存缺失或过期时推迟到首次解析再编译
+            if self._load_hyperscan_cache(rule_path, rule_data.get('patterns_sha256')):
+                source = 'cache'
+            elif hyperscan is not None and len(self.parsing_rules) >= HYPERSCAN_MIN_RULES:
+                source = 'deferred'
+            else:
+                source = 're'
 
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"Rules loaded from: {rule_path} ({source}, {elapsed_ms:.2f} ms)")
             return True
 
         except Exception as e:
@@ -412,15 +975,22 @@ class NetworkConfigParser:
             self.generate_parsing_rules()
 
         result = {
-            'metadata': asdict(self.metadata),
+            'metadata': self.metadata.to_dict(),
             'device_info': {},
             'interfaces': [],
             'raw_data': {}
         }
 
+        # 先用 Hyperscan 单次扫描找出可能命中的规则，未命中的规则无需再用 re 扫描
+        matched = self._prefilter_rules()
+
         # 应用规则提取数据
         for field_name, pattern in self.parsing_rules.items():
-            matches = re.finditer(pattern, self.raw_config, re.MULTILINE)
+            if matched is not None and field_name not in matched:
+                result['raw_data'][field_name] = []
+                continue
+
+            matches = self._compile_rule(pattern, re.MULTILINE).finditer(self.raw_config)
             values = []
 
             for match in matches:
@@ -434,21 +1004,133 @@ class NetworkConfigParser:
             result['raw_data'][field_name] = values
 
         # 转换为结构化数据
-        result['device_info'] = asdict(self.device_info)
-        result['interfaces'] = [asdict(i) for i in self.interfaces]
+        result['device_info'] = self.device_info.to_dict()
+        result['interfaces'] = self._interface_dicts()
 
         return result
 
+    def _hyperscan_db(self):
+        """
+        返回当前规则集的 Hyperscan 数据库
+
+        未安装、规则数少于 HYPERSCAN_MIN_RULES（逐条 re 更快）或编译失败时返回 None。
+        """
+        if hyperscan is None or len(self.parsing_rules) < HYPERSCAN_MIN_RULES:
+            return None
+
+        if dict(self._hs_rules) != self.parsing_rules:
+            self._hs_rules = tuple(self.parsing_rules.items())
+            self._hs_db = _shared_hyperscan_db(tuple(self.parsing_rules.values()))
+        return self._hs_db
+
+    def _save_hyperscan_cache(self, rule_path: Path, patterns_sha256: str) -> bool:
+        """将 Hyperscan 数据库写入规则文件旁的 .hsdb（首行为规则集指纹和 pattern id 对应的字段名）"""
+        database = self._hyperscan_db()
+        if database is None:
+            return False
+
+        header = {
+            'patterns_sha256': patterns_sha256,
+            'fields': [field_name for field_name, _ in self._hs_rules]
+        }
+        try:
+            with open(rule_path.with_suffix('.hsdb'), 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(hyperscan.dumpb(database))
+            return True
+        except Exception as e:
+            print(f"Error saving hyperscan cache: {e}")
+            return False
+
+    def _load_hyperscan_cache(self, rule_path: Path, patterns_sha256: Optional[str]) -> bool:
+        """
+        从 .hsdb 加载 Hyperscan 数据库
+
+        仅当缓存不早于 YAML、且规则文件记录的指纹与实际规则及缓存首行一致时使用。
+        """
+        cache_path = rule_path.with_suffix('.hsdb')
+        if (hyperscan is None or len(self.parsing_rules) < HYPERSCAN_MIN_RULES
+                or not patterns_sha256 or not cache_path.exists()):
+            return False
+
+        if patterns_sha256 != _rules_sha256(self.parsing_rules):
+            return False
+
+        try:
+            if cache_path.stat().st_mtime < rule_path.stat().st_mtime:
+                return False
+
+            with open(cache_path, 'rb') as f:
+                header, _, blob = f.read().partition(b'\n')
+            header = json.loads(header)
+            if header.get('patterns_sha256') != patterns_sha256:
+                return False
+            # YAML 保存时按键排序，字段顺序以缓存记录的 pattern id 顺序为准
+            hs_rules = tuple((field_name, self.parsing_rules[field_name])
+                             for field_name in header['fields'])
+
+            database = hyperscan.loadb(blob, mode=hyperscan.HS_MODE_BLOCK)
+            database.scratch = hyperscan.Scratch(database)
+        except Exception:
+            # 缓存损坏或与当前 Hyperscan 版本/平台不兼容，回退到重新编译
+            return False
+
+        self._hs_db = database
+        self._hs_rules = hs_rules
+        _hs_cache_put(_hs_cache_key(tuple(pattern for _, pattern in hs_rules)), database)
+        return True
+
+    def _prefilter_rules(self, text: Optional[str] = None) -> Optional[set]:
+        """
+        单次扫描文本（默认为配置文本），返回可能命中的规则字段名集合
+
+        只报告 self.parsing_rules 中的规则；无法预筛选时返回 None。
+        """
+        database = self._hyperscan_db()
+        if database is None:
+            return None
+        if text is None:
+            text = self.raw_config
+
+        matched = set()
+        hs_rules = self._hs_rules
+
+        def on_match(rule_id, start, end, flags, context):
+            matched.add(hs_rules[rule_id][0])
+
+        try:
+            database.scan(text.encode('utf-8'), match_event_handler=on_match)
+        except Exception:
+            return None
+        return matched
+
+    def _compile_rule(self, pattern: str, flags: int = 0) -> re.Pattern:
+        """编译用户规则（按规则字符串和 flags 缓存，规则变更后自动使用新条目）"""
+        key = (pattern, flags)
+        compiled = self._compiled_rules.get(key)
+        if compiled is None:
+            compiled = self._compiled_rules[key] = re.compile(pattern, flags)
+        return compiled
+
     def optimize_rules(self, failed_samples: List[str]) -> Dict[str, str]:
         """优化解析规则（步骤6）"""
         optimized_rules = self.parsing_rules.copy()
 
         # 分析失败样本，识别模式变化
         for sample in failed_samples:
+            # 每个样本只做一次多模式扫描：未被预筛选命中的原有规则必然不匹配，无需再逐条 search
+            matched = self._prefilter_rules(sample)
+
             # 尝试从失败样本中提取新的模式
             for field_name, pattern in optimized_rules.items():
-                # 检查现有模式是否匹配
-                if not re.search(pattern, sample):
+                if (matched is not None and field_name not in matched
+                        and pattern == self.parsing_rules.get(field_name)):
+                    failed = True
+                else:
+                    # 检查现有模式是否匹配（预筛选命中可能有误报，已更新的规则也不在数据库中）
+                    failed = not self._compile_rule(pattern).search(sample)
+
+                if failed:
                     # 尝试生成新的模式
                     new_pattern = self._generate_adaptive_pattern(field_name, sample)
                     if new_pattern:
@@ -463,17 +1145,10 @@ class NetworkConfigParser:
         # 目前返回简化版本
 
         if field_name == 'hostname':
-            # 尝试多种 hostname 格式
-            patterns = [
-                r'hostname\s+(?P<hostname>\S+)',
-                r'sysname\s+(?P<hostname>\S+)',
-                r'set-system-hostname\s+"?(?P<hostname>\S+)"?',
-                r'host-name\s+(?P<hostname>\S+)'
-            ]
-
-            for pattern in patterns:
-                if re.search(pattern, sample):
-                    return pattern
+            # 尝试多种 hostname 格式：单次扫描，取命中的排在最前的候选模式
+            index = _best_priority(_CompiledRules.ADAPTIVE_HOSTNAME_UNION, sample)
+            if index is not None:
+                return _CompiledRules.ADAPTIVE_HOSTNAME[index][0]
 
         return None
 
@@ -481,14 +1156,13 @@ class NetworkConfigParser:
         """导出为 JSON 格式"""
         try:
             data = {
-                'metadata': asdict(self.metadata),
-                'device_info': asdict(self.device_info),
-                'interfaces': [asdict(i) for i in self.interfaces],
+                'metadata': self.metadata.to_dict(),
+                'device_info': self.device_info.to_dict(),
+                'interfaces': self._interface_dicts(),
                 'exported_at': datetime.now().isoformat()
             }
 
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            Path(output_file).write_bytes(_dumps_indented(data))
 
             return True
 
@@ -528,6 +1202,63 @@ class NetworkConfigParser:
             return False
 
 
+def _build_vendor_extractors(vendor: str) -> Dict[str, Callable[[NetworkConfigParser], Any]]:
+    """生成厂商提取函数：各函数直接绑定该厂商的预编译正则和规则模板，以解析器为参数调用"""
+    version = _CompiledRules.VERSION.get(vendor)
+    device_info = _CompiledRules.DEVICE_INFO.get(vendor, _CompiledRules.DEVICE_INFO[''])
+    template = _RULE_TEMPLATES.get(vendor, {})
+
+    def extract_version(parser: NetworkConfigParser) -> None:
+        parser._search_version(version)
+
+    def extract_device_info(parser: NetworkConfigParser) -> None:
+        parser._scan_device_info(*device_info)
+
+    def extract_interfaces(parser: NetworkConfigParser) -> None:
+        # 该厂商不提取接口配置
+        pass
+
+    if vendor in _CompiledRules.INTERFACE_VENDORS:
+        extract_interfaces = NetworkConfigParser._scan_interfaces
+
+    def generate_parsing_rules(parser: NetworkConfigParser) -> Dict[str, str]:
+        return parser._use_rule_template(template)
+
+    return {
+        'version': extract_version,
+        'device_info': extract_device_info,
+        'interfaces': extract_interfaces,
+        'parsing_rules': generate_parsing_rules,
+    }
+
+
+# 厂商 -> 厂商提取函数；未识别厂商时使用通用提取函数
+_VENDOR_EXTRACTORS = {vendor: _build_vendor_extractors(vendor) for vendor in _CompiledRules.VENDOR}
+_GENERIC_EXTRACTORS = _build_vendor_extractors('')
+
+
+def _parse_config_file(path: str, parser_class=NetworkConfigParser) -> Dict[str, Any]:
+    """解析单个配置文件（parse_many 的工作进程入口，需为模块级函数以便 pickle）"""
+    result = {'file': path, 'success': False}
+
+    parser = parser_class()
+    if not parser.load_config(path):
+        return result
+
+    parser.identify_device()
+    data = parser.extract_data()
+    is_valid, quality_score, warnings = parser.validate_quality(data)
+
+    result.update({
+        'success': True,
+        'data': data,
+        'is_valid': is_valid,
+        'quality_score': quality_score,
+        'warnings': warnings
+    })
+    return result
+
+
 def main():
     """示例用法"""
     parser = NetworkConfigParser()
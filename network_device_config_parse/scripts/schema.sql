@@ -66,11 +66,12 @@ CREATE TABLE IF NOT EXISTS config_files (
     id SERIAL PRIMARY KEY,
     file_name VARCHAR(255) NOT NULL,          -- 文件名
     file_path TEXT,                           -- 文件路径（可选）
-    file_hash VARCHAR(64) UNIQUE,              -- 文件MD5哈希（去重）
+    file_hash VARCHAR(64) UNIQUE,              -- 文件BLAKE2b哈希（去重）
     file_size BIGINT,                         -- 文件大小（字节）
 
     -- 配置内容（可存储，也可只存路径）
     content TEXT,                              -- 配置文件内容
+    content_zstd BYTEA,                        -- zstd 压缩的配置内容（UTF-8，安装 zstandard 时代替 content）
     content_preview TEXT,                      -- 内容预览（前1000字符）
 
     -- 关联识别的设备元数据
@@ -88,6 +89,9 @@ CREATE TABLE IF NOT EXISTS config_files (
 );
 
 -- 索引
+-- 已有数据库补充压缩内容列
+ALTER TABLE config_files ADD COLUMN IF NOT EXISTS content_zstd BYTEA;
+
 CREATE INDEX IF NOT EXISTS idx_config_file_hash ON config_files(file_hash);
 CREATE INDEX IF NOT EXISTS idx_config_device ON config_files(identified_device_id);
 CREATE INDEX IF NOT EXISTS idx_config_status ON config_files(parse_status);
@@ -320,6 +324,24 @@ LEFT JOIN parse_results pr ON pr.config_file_id = cf.id
 GROUP BY dm.vendor, dm.device_type, dm.model
 ORDER BY file_count DESC;
 
+-- 视图：解析结果摘要（每个配置文件一行，供验证脚本按文件名列出）
+-- 普通视图，写入路径无需刷新；按 file_name 排序分页走 idx_config_file_name 索引
+DROP MATERIALIZED VIEW IF EXISTS mv_parse_results_summary;
+CREATE OR REPLACE VIEW v_parse_results_summary AS
+SELECT
+    cf.file_name,
+    dm.vendor,
+    dm.device_type,
+    di.hostname,
+    pr.quality_score,
+    pr.validation_status
+FROM config_files cf
+LEFT JOIN device_metadata dm ON cf.identified_device_id = dm.id
+LEFT JOIN parse_results pr ON cf.id = pr.config_file_id
+LEFT JOIN device_info di ON pr.id = di.parse_result_id;
+
+CREATE INDEX IF NOT EXISTS idx_config_file_name ON config_files(file_name);
+
 -- ============================================================================
 -- 11. 数据清理策略
 -- ============================================================================
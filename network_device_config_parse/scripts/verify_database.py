@@ -10,8 +10,12 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+# 项目根目录与测试配置目录（模块加载时计算一次）
+_BASE_DIR = Path(__file__).resolve().parent.parent
+_TEST_CONFIGS_DIR = _BASE_DIR / 'test_configs'
+
 # 添加父目录到路径以导入解析模块
-sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(_BASE_DIR))
 
 from scripts.parser import NetworkConfigParser
 from scripts.db_manager import DatabaseManager, DBConfig
@@ -70,7 +74,7 @@ def verify_database_integration():
     print_section("步骤3: 解析配置文件并存储到数据库")
 
     # 测试配置文件目录
-    test_configs_dir = Path(__file__).parent.parent / 'test_configs'
+    test_configs_dir = _TEST_CONFIGS_DIR
 
     # 配置文件列表（按照网络层级顺序）
     config_files = [
@@ -80,6 +84,13 @@ def verify_database_integration():
     ]
 
     parse_results = []
+    pending_results = []
+
+    # 创建解析器（所有配置文件共用，已编译的规则在文件之间复用）
+    parser = NetworkConfigParser()
+
+    # 本次的规则与解析结果写入同一个事务，全部保存后统一提交（单个写入失败只回滚该次写入）
+    db_manager.begin()
 
     for config_file, description in config_files:
         print(f"\n--- 解析 {description}: {config_file} ---")
@@ -89,9 +100,13 @@ def verify_database_integration():
             print(f"[FAIL] 配置文件不存在: {config_path}")
             continue
 
-        # 创建解析器
-        parser = NetworkConfigParser()
-        parser.load_config(str(config_path))
+        # 清空上一个文件的解析状态
+        parser.reset()
+
+        # 配置文件只读一次，解析器与数据库记录共用同一份内容
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config_content = f.read()
+        parser.load_config_string(config_content)
 
         # 步骤1: 识别设备
         metadata = parser.identify_device()
@@ -109,9 +124,6 @@ def verify_database_integration():
             print(f"  警告: {', '.join(warnings)}")
 
         # 准备配置文件信息
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config_content = f.read()
-
         config_file_info = {
             'file_name': config_file,
             'file_path': str(config_path),
@@ -137,61 +149,66 @@ def verify_database_integration():
         }
 
         # 步骤4: 生成并保存解析规则
-        parser.generate_parsing_rules()
         rule_data = {
             'metadata': parse_data['metadata'],
-            'patterns': parser.parsing_rules
+            'patterns': parser.generate_parsing_rules()
         }
 
         # 保存规则到数据库
         db_manager.save_parsing_rule(rule_data)
 
-        # 步骤5: 保存解析结果到数据库
-        result_id = db_manager.save_parse_result(config_file_info, parse_data)
-
-        if result_id > 0:
-            print(f"[OK] 解析结果已保存到数据库 (ID: {result_id})")
-
-            # 提取 OSPF 和 BGP 配置用于关系验证
-            ospf_config = extract_ospf_config(config_content)
-            bgp_config = extract_bgp_config(config_content)
-
-            parse_results.append({
-                'file': config_file,
-                'description': description,
-                'vendor': metadata.vendor,
-                'device_type': metadata.device_type,
-                'hostname': data.get('device_info', {}).get('hostname'),
-                'quality_score': quality_score,
-                'ospf': ospf_config,
-                'bgp': bgp_config,
-                'result_id': result_id
-            })
-        else:
-            print(f"[FAIL] 保存解析结果失败")
+        # 步骤5: 暂存解析结果，循环结束后一次性批量写入数据库
+        pending_results.append(((config_file_info, parse_data), {
+            'file': config_file,
+            'description': description,
+            'vendor': metadata.vendor,
+            'device_type': metadata.device_type,
+            'hostname': data.get('device_info', {}).get('hostname'),
+            'quality_score': quality_score,
+            # OSPF 和 BGP 配置用于关系验证（extract_data 已一并提取）
+            'ospf': data['routing']['ospf'],
+            'bgp': data['routing']['bgp']
+        }))
+
+    # 批量保存解析结果（单个事务，按输入顺序返回 ID）
+    result_ids = db_manager.save_parse_results_bulk([item for item, _ in pending_results])
+    if pending_results and not result_ids:
+        print(f"[FAIL] 保存解析结果失败")
+        db_manager.rollback()
+    elif not db_manager.commit():
+        db_manager.rollback()
+        print(f"[FAIL] 提交解析结果失败，已回滚")
+    else:
+        # 事务提交成功后才确认保存
+        for (_, result), result_id in zip(pending_results, result_ids):
+            print(f"[OK] {result['file']} 解析结果已保存到数据库 (ID: {result_id})")
+            result['result_id'] = result_id
+            parse_results.append(result)
 
     # 步骤4: 验证数据库中的数据
     print_section("步骤4: 验证数据库中的数据")
 
     # 获取统计信息
     stats = db_manager.get_parse_statistics()
-    print(f"\n数据库统计:")
-    print(f"  总配置文件数: {stats.get('total_files', 0)}")
-    print(f"  平均质量分数: {stats.get('average_quality_score', 0):.2%}")
-    print(f"\n  状态分布:")
-    for status, count in stats.get('status_distribution', {}).items():
-        print(f"    {status}: {count}")
-    print(f"\n  厂商分布:")
-    for vendor, count in stats.get('vendor_distribution', {}).items():
-        print(f"    {vendor}: {count}")
+    print("\n".join([
+        f"\n数据库统计:",
+        f"  总配置文件数: {stats.get('total_files', 0)}",
+        f"  平均质量分数: {stats.get('average_quality_score', 0):.2%}",
+        f"\n  状态分布:",
+        *(f"    {status}: {count}" for status, count in stats.get('status_distribution', {}).items()),
+        f"\n  厂商分布:",
+        *(f"    {vendor}: {count}" for vendor, count in stats.get('vendor_distribution', {}).items())
+    ]))
 
     # 步骤5: 验证设备关联关系
     print_section("步骤5: 验证设备关联关系 (OSPF/BGP)")
 
-    print("\n网络拓扑关系:")
+    # 各节输出先收集到列表，节末一次写出，减少 stdout 写入次数
+    lines = []
+    lines.append("\n网络拓扑关系:")
 
     # 显示 OSPF 关系
-    print("\n  OSPF 邻居关系:")
+    lines.append("\n  OSPF 邻居关系:")
     ospf_relationships = []
 
     for result in parse_results:
@@ -205,13 +222,13 @@ def verify_database_integration():
 
     # 输出 OSPF 关系
     for i, rel in enumerate(ospf_relationships):
-        print(f"\n    设备: {rel['device']}")
-        print(f"    Router ID: {rel['router_id']}")
-        print(f"    OSPF Area: {rel['area']}")
-        print(f"    宣告网络: {', '.join(rel['networks'])}")
+        lines.append(f"\n    设备: {rel['device']}")
+        lines.append(f"    Router ID: {rel['router_id']}")
+        lines.append(f"    OSPF Area: {rel['area']}")
+        lines.append(f"    宣告网络: {', '.join(rel['networks'])}")
 
     # 查找 OSPF 邻居关系
-    print("\n    OSPF 拓扑连接:")
+    lines.append("\n    OSPF 拓扑连接:")
     if len(ospf_relationships) >= 2:
         # RT-CORE-01 和 SW-DIST-01 应该在同一个 Area 0
         core_router = next((r for r in ospf_relationships if r['device'] == 'RT-CORE-01'), None)
@@ -219,12 +236,12 @@ def verify_database_integration():
 
         if core_router and dist_switch:
             if core_router['area'] == dist_switch['area'] == '0.0.0.0':
-                print(f"      [OK] {core_router['device']} <-- OSPF Area 0 --> {dist_switch['device']}")
+                lines.append(f"      [OK] {core_router['device']} <-- OSPF Area 0 --> {dist_switch['device']}")
             else:
-                print(f"      [FAIL] OSPF Area 不匹配")
+                lines.append(f"      [FAIL] OSPF Area 不匹配")
 
     # 显示 BGP 关系
-    print("\n  BGP 邻居关系:")
+    lines.append("\n  BGP 邻居关系:")
     bgp_relationships = []
 
     for result in parse_results:
@@ -238,18 +255,21 @@ def verify_database_integration():
 
     # 输出 BGP 关系
     for i, rel in enumerate(bgp_relationships):
-        print(f"\n    设备: {rel['device']}")
-        print(f"    BGP Router ID: {rel['router_id']}")
-        print(f"    AS 号: {rel['as_number']}")
+        lines.append(f"\n    设备: {rel['device']}")
+        lines.append(f"    BGP Router ID: {rel['router_id']}")
+        lines.append(f"    AS 号: {rel['as_number']}")
         if rel['neighbors']:
-            print(f"    BGP 邻居:")
+            lines.append(f"    BGP 邻居:")
             for neighbor in rel['neighbors']:
-                print(f"      - 邻居 IP: {neighbor['ip']}, AS: {neighbor['as']}")
+                lines.append(f"      - 邻居 IP: {neighbor['ip']}, AS: {neighbor['as']}")
+
+    print("\n".join(lines))
 
     # 步骤6: 验证接口连接
     print_section("步骤6: 验证接口连接关系")
 
-    print("\n  物理连接:")
+    lines = []
+    lines.append("\n  物理连接:")
 
     # 从配置文件中提取的连接关系
     connections = [
@@ -270,69 +290,63 @@ def verify_database_integration():
     ]
 
     for conn in connections:
-        print(f"\n    {conn['from']} ({conn['from_interface']})")
-        print(f"      |---> {conn['to']} ({conn['to_interface']})")
-        print(f"      网络: {conn['network']}")
+        lines.append(f"\n    {conn['from']} ({conn['from_interface']})")
+        lines.append(f"      |---> {conn['to']} ({conn['to_interface']})")
+        lines.append(f"      网络: {conn['network']}")
+
+    print("\n".join(lines))
 
     # 步骤7: 验证数据库查询
     print_section("步骤7: 验证数据库查询功能")
 
-    print("\n  从数据库查询设备信息:")
+    lines = []
+    lines.append("\n  从数据库查询设备信息:")
 
     try:
-        # 查询所有解析结果摘要
-        db_manager.cursor.execute("""
-            SELECT
-                cf.file_name,
-                dm.vendor,
-                dm.device_type,
-                di.hostname,
-                pr.quality_score,
-                pr.validation_status
-            FROM config_files cf
-            LEFT JOIN device_metadata dm ON cf.identified_device_id = dm.id
-            LEFT JOIN parse_results pr ON cf.id = pr.config_file_id
-            LEFT JOIN device_info di ON pr.id = di.parse_result_id
-            ORDER BY cf.file_name
-        """)
-
-        results = db_manager.cursor.fetchall()
-
-        if results:
-            print("\n  解析结果摘要:")
-            print(f"  {'文件名':<25} {'厂商':<10} {'设备类型':<15} {'主机名':<20} {'质量分数':<10} {'状态':<10}")
-            print("  " + "-" * 100)
-            for row in results:
-                quality = f"{row['quality_score']:.2%}" if row['quality_score'] else "N/A"
-                print(f"  {row['file_name']:<25} {row['vendor']:<10} {row['device_type']:<15} "
-                      f"{row['hostname'] or 'N/A':<20} {quality:<10} {row['validation_status']:<10}")
-        else:
-            print("  [FAIL] 未找到解析结果")
+        # 查询所有解析结果摘要（摘要视图，服务端游标逐批读取）
+        row_count = 0
+        for row in db_manager.iter_parse_summary():
+            if row_count == 0:
+                lines.append("\n  解析结果摘要:")
+                lines.append(f"  {'文件名':<25} {'厂商':<10} {'设备类型':<15} {'主机名':<20} {'质量分数':<10} {'状态':<10}")
+                lines.append("  " + "-" * 100)
+            row_count += 1
+            quality = f"{row['quality_score']:.2%}" if row['quality_score'] else "N/A"
+            lines.append(f"  {row['file_name']:<25} {row['vendor']:<10} {row['device_type']:<15} "
+                         f"{row['hostname'] or 'N/A':<20} {quality:<10} {row['validation_status']:<10}")
+
+        if row_count == 0:
+            lines.append("  [FAIL] 未找到解析结果")
 
     except Exception as e:
-        print(f"  [FAIL] 查询失败: {e}")
+        lines.append(f"  [FAIL] 查询失败: {e}")
+
+    print("\n".join(lines))
 
     # 最终总结
     print_section("验证总结")
 
-    print("\n  [OK] 成功完成以下操作:")
-    print(f"    1. 连接到 PostgreSQL 数据库 (lhdren.cn:15432)")
-    print(f"    2. 初始化数据库架构 (9 个表)")
-    print(f"    3. 解析 {len(parse_results)} 个网络设备配置文件")
-    print(f"    4. 生成并保存解析规则到数据库")
-    print(f"    5. 保存解析结果到数据库")
-    print(f"    6. 验证 OSPF 路由协议关系")
-    print(f"    7. 验证 BGP 路由协议关系")
-    print(f"    8. 验证设备间物理连接关系")
-    print(f"    9. 查询并验证数据库中的数据")
-
-    print(f"\n  解析文件统计:")
+    lines = []
+    lines.append("\n  [OK] 成功完成以下操作:")
+    lines.append(f"    1. 连接到 PostgreSQL 数据库 (lhdren.cn:15432)")
+    lines.append(f"    2. 初始化数据库架构 (9 个表)")
+    lines.append(f"    3. 解析 {len(parse_results)} 个网络设备配置文件")
+    lines.append(f"    4. 生成并保存解析规则到数据库")
+    lines.append(f"    5. 保存解析结果到数据库")
+    lines.append(f"    6. 验证 OSPF 路由协议关系")
+    lines.append(f"    7. 验证 BGP 路由协议关系")
+    lines.append(f"    8. 验证设备间物理连接关系")
+    lines.append(f"    9. 查询并验证数据库中的数据")
+
+    lines.append(f"\n  解析文件统计:")
     for result in parse_results:
         status = "[OK]" if result['quality_score'] >= 0.8 else "[WARN]"
-        print(f"    {status} {result['description']}: {result['hostname']} ({result['vendor']} {result['device_type']}) "
-              f"- 质量: {result['quality_score']:.2%}")
+        lines.append(f"    {status} {result['description']}: {result['hostname']} ({result['vendor']} {result['device_type']}) "
+                     f"- 质量: {result['quality_score']:.2%}")
 
-    print(f"\n  平均质量分数: {sum(r['quality_score'] for r in parse_results)/len(parse_results):.2%}")
+    lines.append(f"\n  平均质量分数: {sum(r['quality_score'] for r in parse_results)/len(parse_results):.2%}")
+
+    print("\n".join(lines))
 
     # 关闭数据库连接
     db_manager.disconnect()
@@ -342,105 +356,6 @@ def verify_database_integration():
     return True
 
 
-def extract_ospf_config(config_content):
-    """从配置内容中提取 OSPF 配置"""
-    ospf_config = {}
-
-    lines = config_content.split('\n')
-    in_ospf_block = False
-
-    for line in lines:
-        line = line.strip()
-
-        # 检测 OSPF 配置开始
-        if 'router ospf' in line.lower() or 'ospf' in line.lower():
-            in_ospf_block = True
-            # 提取 OSPF 进程号
-            parts = line.split()
-            if len(parts) >= 3:
-                ospf_config['process_id'] = parts[2].strip()
-            continue
-
-        if in_ospf_block:
-            # 提取 Router ID
-            if 'router-id' in line.lower():
-                parts = line.split()
-                if len(parts) >= 2:
-                    ospf_config['router_id'] = parts[-1].strip()
-
-            # 提取 Area
-            if 'area' in line.lower():
-                parts = line.split()
-                for i, part in enumerate(parts):
-                    if part.lower() == 'area' and i + 1 < len(parts):
-                        ospf_config['area'] = parts[i + 1].strip()
-                        break
-
-            # 提取网络
-            if 'network' in line.lower():
-                parts = line.split()
-                if len(parts) >= 4:
-                    network = f"{parts[1]}/{parts[3]}"
-                    if 'networks' not in ospf_config:
-                        ospf_config['networks'] = []
-                    ospf_config['networks'].append(network)
-
-            # OSPF 块结束（遇到 ! 或其他配置块）
-            if line == '!' or line.startswith('interface') or line.startswith('router bgp'):
-                in_ospf_block = False
-
-    return ospf_config if ospf_config else None
-
-
-def extract_bgp_config(config_content):
-    """从配置内容中提取 BGP 配置"""
-    bgp_config = {}
-
-    lines = config_content.split('\n')
-    in_bgp_block = False
-
-    for line in lines:
-        line = line.strip()
-
-        # 检测 BGP 配置开始
-        if 'router bgp' in line.lower() or 'bgp' in line.lower():
-            in_bgp_block = True
-            # 提取 AS 号
-            parts = line.split()
-            if len(parts) >= 3:
-                bgp_config['as_number'] = parts[2].strip()
-            continue
-
-        if in_bgp_block:
-            # 提取 Router ID
-            if 'router-id' in line.lower():
-                parts = line.split()
-                if len(parts) >= 2:
-                    bgp_config['router_id'] = parts[-1].strip()
-
-            # 提取邻居
-            if 'neighbor' in line.lower() or 'peer' in line.lower():
-                parts = line.split()
-                if len(parts) >= 3:
-                    neighbor_ip = parts[1]
-                    # 查找 AS 号
-                    for i, part in enumerate(parts):
-                        if part.lower() in ['remote-as', 'as-number'] and i + 1 < len(parts):
-                            if 'neighbors' not in bgp_config:
-                                bgp_config['neighbors'] = []
-                            bgp_config['neighbors'].append({
-                                'ip': neighbor_ip,
-                                'as': parts[i + 1].strip()
-                            })
-                            break
-
-            # BGP 块结束
-            if line == '!' or line.startswith('interface') or line.startswith('ip route'):
-                in_bgp_block = False
-
-    return bgp_config if bgp_config else None
-
-
 if __name__ == '__main__':
     try:
         success = verify_database_integration()
@@ -6,13 +6,21 @@ List Skills - 列出所有本地技能文件
     python list_skills.py
 """
 
+import os
 from pathlib import Path
 
+# 技能根目录（模块加载时计算一次）
+SKILLS_DIR = Path(__file__).resolve().parent.parent
+
 
 def list_all_skills():
     """列出所有 skills"""
-    skills_dir = Path(__file__).parent.parent
-    skill_files = list(skills_dir.glob("*/SKILL.md"))
+    # 只看一级子目录，直接检查其中的 SKILL.md
+    with os.scandir(SKILLS_DIR) as entries:
+        skill_files = [
+            Path(entry.path, "SKILL.md") for entry in entries
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "SKILL.md"))
+        ]
 
     print("=" * 50)
     print(f"本地技能列表 (共 {len(skill_files)} 个)")
@@ -23,8 +31,8 @@ def list_all_skills():
         # 读取 skill 描述
         try:
             with open(skill_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                for line in lines:
+                # 逐行读取，找到描述后立即停止，不读入整个文件
+                for line in f:
                     if line.startswith("description:"):
                         desc = line.split(":", 1)[1].strip()
                         print(f"\n[{skill_name}]")
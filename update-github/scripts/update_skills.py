@@ -15,17 +15,21 @@ import sys
 import subprocess
 from datetime import datetime
 from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+# 技能根目录（模块加载时计算一次）
+SKILLS_DIR = Path(__file__).resolve().parent.parent
 
 
 def run_command(cmd, description=""):
-    """执行 shell 命令并返回结果"""
+    """执行命令（参数列表，不经过 shell）并返回结果"""
     try:
         result = subprocess.run(
             cmd,
-            shell=True,
             capture_output=True,
             text=True,
-            encoding="utf-8"
+            encoding="utf-8",
+            check=False
         )
         if result.returncode != 0:
             print(f"错误: {description} 失败")
@@ -39,25 +43,48 @@ def run_command(cmd, description=""):
 
 def get_all_skills():
     """获取所有本地 skill 文件"""
-    skills_dir = Path(__file__).parent.parent
-    skill_files = list(skills_dir.glob("*/SKILL.md"))
-    return [f.parent.name for f in skill_files]
+    return [f.parent.name for f in SKILLS_DIR.glob("*/SKILL.md")]
+
 
+class GitState(NamedTuple):
+    """git 仓库状态：当前分支和变更列表（git status --short 格式）"""
+    branch: Optional[str]
+    changes: List[str]
 
-def get_current_branch():
-    """获取当前 git 分支"""
-    success, output = run_command("git rev-parse --abbrev-ref HEAD", "获取分支")
-    if success:
-        return output.strip()
-    return None
 
+def get_git_state():
+    """
+    一次 git 调用同时获取当前分支和变更列表
 
-def get_git_status():
-    """获取 git 状态"""
-    success, output = run_command("git status --short", "获取状态")
-    if success:
-        return output.strip()
-    return ""
+    使用 --porcelain=v2 -z：各条记录以 NUL 分隔，路径不做引号转义，可直接解析
+
+    Returns:
+        GitState；不在 git 仓库中时返回 None
+    """
+    success, output = run_command(["git", "status", "--branch", "--porcelain=v2", "-z"], "获取状态")
+    if not success:
+        return None
+
+    branch = None
+    changes = []
+    records = iter(output.split("\0"))
+    for record in records:
+        if record.startswith("# branch.head "):
+            branch = record[len("# branch.head "):]
+            # 分离头指针时与 git rev-parse --abbrev-ref HEAD 的输出保持一致
+            if branch == "(detached)":
+                branch = "HEAD"
+        elif record.startswith(("? ", "! ")):
+            changes.append(f"{record[0] * 2} {record[2:]}")
+        elif record[:2] in ("1 ", "2 ", "u "):
+            # 普通变更 / 重命名 / 冲突条目的路径分别位于第 9、10、11 个字段
+            fields = record.split(" ", {"1": 8, "2": 9, "u": 10}[record[0]])
+            path = fields[-1]
+            # 重命名/复制条目的原路径是紧随其后的一条独立记录
+            if record[0] == "2":
+                path = f"{next(records, '')} -> {path}"
+            changes.append(f"{fields[1].replace('.', ' ')} {path}")
+    return GitState(branch, changes)
 
 
 def update_github(custom_message=None):
@@ -66,9 +93,9 @@ def update_github(custom_message=None):
     print("GitHub Skills 更新工具")
     print("=" * 50)
 
-    # 1. 检查是否在 git 仓库中
-    success, _ = run_command("git rev-parse --git-dir", "检查 git 仓库")
-    if not success:
+    # 1. 检查是否在 git 仓库中，同时取得分支和变更
+    state = get_git_state()
+    if state is None:
         print("错误: 当前目录不是一个 git 仓库")
         return False
 
@@ -81,16 +108,15 @@ def update_github(custom_message=None):
 
     # 3. 检查变更
     print("\n[2/4] 检查文件变更...")
-    status = get_git_status()
-    if not status:
+    branch, changes = state
+    if not changes:
         print("没有检测到变更，无需更新")
         return True
     print("检测到以下变更:")
-    print(status)
+    print("\n".join(changes))
 
-    # 4. 获取当前分支
+    # 4. 当前分支
     print("\n[3/4] 准备提交...")
-    branch = get_current_branch()
     if not branch:
         print("错误: 无法获取当前分支")
         return False
@@ -98,7 +124,7 @@ def update_github(custom_message=None):
 
     # 5. 暂存所有文件
     print("\n暂存文件...")
-    success, _ = run_command("git add .", "暂存文件")
+    success, _ = run_command(["git", "add", "."], "暂存文件")
     if not success:
         return False
 
@@ -121,10 +147,7 @@ Co-Authored-By: Claude Sonnet 4.5 <noreply@anthropic.com>"""
     print(commit_msg)
     print("-" * 40)
 
-    success, output = run_command(
-        f'git commit -m "{commit_msg}"',
-        "创建提交"
-    )
+    success, output = run_command(["git", "commit", "-m", commit_msg], "创建提交")
     if not success:
         print("注意: 没有新的变更需要提交")
         return True
@@ -132,10 +155,7 @@ Co-Authored-By: Claude Sonnet 4.5 <noreply@anthropic.com>"""
 
     # 7. 推送到 GitHub
     print(f"\n[4/4] 推送到 GitHub (分支: {branch})...")
-    success, output = run_command(
-        f"git push origin {branch}",
-        "推送"
-    )
+    success, output = run_command(["git", "push", "origin", branch], "推送")
     if not success:
         return False
     print("推送成功!")
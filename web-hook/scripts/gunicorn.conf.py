@@ -0,0 +1,31 @@
+"""
+Gunicorn 生产环境配置
+
+simple_server.py 与 skill_server.py 共用的生产环境入口，`python xxx.py` 仅用于本地开发。
+
+运行:
+    gunicorn -c gunicorn.conf.py simple_server:app
+    gunicorn -c gunicorn.conf.py skill_server:app
+
+两个服务同时部署时，用 GUNICORN_BIND 为其指定不同的监听地址。
+"""
+
+import multiprocessing
+import os
+
+# 监听地址（可通过环境变量覆盖，例如放在 Nginx 之后时绑定 127.0.0.1 或 unix socket）
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# 预派生的 worker 数量：按 2*CPU+1 多进程并发处理
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# 两个服务均为 ASGI 应用（FastAPI），由 Gunicorn 管理进程、Uvicorn worker 运行事件循环
+# （安装 uvicorn[standard] 时自动使用 uvloop / httptools）
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# 单次请求超时（秒）：Claude 长回复可能超过默认的 30 秒
+timeout = 120
+
+# 日志输出到标准输出/标准错误，由 systemd / docker 收集
+accesslog = '-'
+errorlog = '-'
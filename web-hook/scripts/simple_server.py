@@ -5,26 +5,61 @@ Claude API 后端代理服务
 用于安全地代理前端到 Claude API 的请求，避免在前端暴露 API Key。
 
 安装依赖:
-    pip install flask anthropic cors
+    pip install fastapi "uvicorn[standard]" anthropic
 
 运行:
-    python simple_server.py
+    python simple_server.py                               # 本地开发
+    gunicorn -c gunicorn.conf.py simple_server:app        # 生产环境（多进程）
 
 访问:
     http://localhost:5000
 """
 
-from flask import Flask, request, jsonify, render_template_string
-from flask_cors import CORS
-from anthropic import Anthropic
+import asyncio
+import hashlib
+import json
 import os
 
-app = Flask(__name__)
-CORS(app)
+from anthropic import AsyncAnthropic
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON 编解码：安装 orjson 时使用 orjson（更快、分配更少），否则回退到标准库 json
+JSON_RESPONSE = ORJSONResponse if orjson else JSONResponse
+_json_loads = orjson.loads if orjson else json.loads
+
+app = FastAPI(default_response_class=JSON_RESPONSE)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+# 同时进行的 Claude 请求上限（/api/chat 与 /api/batch 共用，超出的请求排队等待，避免触发 429 限流）
+CLAUDE_MAX_CONCURRENCY = 20
 
 # 从环境变量读取 API Key
 API_KEY = os.environ.get('ANTHROPIC_API_KEY', '')
 
+# 模块级共享的 Claude 客户端：复用连接池与 TLS 会话，避免每个请求重新握手
+anthropic_client = AsyncAnthropic(api_key=API_KEY) if API_KEY else None
+
+# Claude 请求并发限制
+_claude_semaphore = asyncio.Semaphore(CLAUDE_MAX_CONCURRENCY)
+
+# SSE 心跳间隔（秒）：流式输出长时间无数据时发送注释帧，防止代理空闲超时断开
+SSE_HEARTBEAT_INTERVAL = 15
+
+# SSE 帧的固定字节片段（预先编码）
+_SSE_PREFIX = b'data: '
+_SSE_SUFFIX = b'\n\n'
+_SSE_KEEPALIVE = b': keepalive\n\n'
+
+# /api/batch 单次请求允许的最大 prompt 数
+BATCH_MAX_SIZE = 20
+
 # HTML 模板
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -176,88 +211,168 @@ HTML_TEMPLATE = """
 """
 
 
-@app.route('/')
-def index():
-    """返回聊天界面"""
-    return render_template_string(HTML_TEMPLATE)
+# 聊天页面在模块加载时编码一次，ETag 取内容摘要
+_INDEX_BODY = HTML_TEMPLATE.encode('utf-8')
+_INDEX_ETAG = f'"{hashlib.sha256(_INDEX_BODY).hexdigest()[:32]}"'
+
+
+async def _read_json(request: Request, expected_type: type = dict):
+    """
+    读取并解析请求体 JSON；直接消费请求流，不在 Request 对象上缓存原始字节
+
+    Returns:
+        (数据, None)；请求体为空、不是合法 JSON 或类型不符时返回 (None, 400 错误响应)
+    """
+    body = b''.join([chunk async for chunk in request.stream()])
+    try:
+        data = _json_loads(body)
+    except ValueError:
+        return None, JSON_RESPONSE({'error': '请求体必须是合法的 JSON'}, status_code=400)
+    if not isinstance(data, expected_type):
+        kind = '对象' if expected_type is dict else '数组'
+        return None, JSON_RESPONSE({'error': f'请求体必须是 JSON {kind}'}, status_code=400)
+    return data, None
+
+
+def _sse_frame(obj) -> bytes:
+    """构造 SSE 数据帧；直接拼接字节，不经过中间 str 与再次编码"""
+    if orjson is not None:
+        return _SSE_PREFIX + orjson.dumps(obj) + _SSE_SUFFIX
+    return _SSE_PREFIX + json.dumps(obj).encode('utf-8') + _SSE_SUFFIX
+
+
+async def _create_message(prompt: str) -> dict:
+    """调用 Claude 生成单条回复，返回 /api/chat 的响应结构"""
+    async with _claude_semaphore:
+        message = await anthropic_client.messages.create(
+            model='claude-3-5-sonnet-20241022',
+            max_tokens=4096,
+            messages=[{'role': 'user', 'content': prompt}]
+        )
+
+    return {
+        'response': message.content[0].text,
+        'model': message.model,
+        'usage': {
+            'input_tokens': message.usage.input_tokens,
+            'output_tokens': message.usage.output_tokens
+        }
+    }
+
+
+@app.get('/')
+async def index(request: Request):
+    """返回聊天界面（内容固定，浏览器携带相同 ETag 时返回 304）"""
+    if request.headers.get('if-none-match') == _INDEX_ETAG:
+        return Response(status_code=304, headers={'ETag': _INDEX_ETAG})
+    return HTMLResponse(_INDEX_BODY, headers={'ETag': _INDEX_ETAG})
 
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
+@app.post('/api/chat')
+async def chat(request: Request):
     """处理聊天请求"""
-    data = request.json
+    data, error = await _read_json(request)
+    if error is not None:
+        return error
     prompt = data.get('prompt', '')
 
     if not prompt:
-        return jsonify({'error': '请提供 prompt'}), 400
+        return JSON_RESPONSE({'error': '请提供 prompt'}, status_code=400)
 
     if not API_KEY:
-        return jsonify({'error': '服务器未配置 API Key'}), 500
+        return JSON_RESPONSE({'error': '服务器未配置 API Key'}, status_code=500)
 
     try:
-        client = Anthropic(api_key=API_KEY)
+        return await _create_message(prompt)
 
-        message = client.messages.create(
-            model='claude-3-5-sonnet-20241022',
-            max_tokens=4096,
-            messages=[{'role': 'user', 'content': prompt}]
-        )
+    except Exception as e:
+        return JSON_RESPONSE({'error': str(e)}, status_code=500)
 
-        response_text = message.content[0].text
 
-        return jsonify({
-            'response': response_text,
-            'model': message.model,
-            'usage': {
-                'input_tokens': message.usage.input_tokens,
-                'output_tokens': message.usage.output_tokens
-            }
-        })
+@app.post('/api/batch')
+async def batch_chat(request: Request):
+    """批量聊天请求：请求体为 [{"prompt": ...}, ...]，并发调用 Claude，按原顺序返回结果列表"""
+    items, error = await _read_json(request, list)
+    if error is not None:
+        return error
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    if not items:
+        return JSON_RESPONSE({'error': '请提供 prompt 列表'}, status_code=400)
 
+    if len(items) > BATCH_MAX_SIZE:
+        return JSON_RESPONSE({'error': f'单次最多 {BATCH_MAX_SIZE} 条'}, status_code=400)
 
-@app.route('/api/stream', methods=['POST'])
-def stream_chat():
-    """流式聊天响应"""
-    from flask import Response
-    import json
+    prompts = [item.get('prompt', '') if isinstance(item, dict) else '' for item in items]
+    if not all(prompts):
+        return JSON_RESPONSE({'error': '请提供 prompt'}, status_code=400)
+
+    if not API_KEY:
+        return JSON_RESPONSE({'error': '服务器未配置 API Key'}, status_code=500)
+
+    # 各条请求并发执行，总耗时约为最慢一条；单条失败只影响自身结果
+    results = await asyncio.gather(*(_create_message(p) for p in prompts), return_exceptions=True)
 
-    data = request.json
+    return [
+        {'error': str(r)} if isinstance(r, Exception) else r
+        for r in results
+    ]
+
+
+@app.post('/api/stream')
+async def stream_chat(request: Request):
+    """流式聊天响应"""
+    data, error = await _read_json(request)
+    if error is not None:
+        return error
     prompt = data.get('prompt', '')
 
     if not prompt:
-        return jsonify({'error': '请提供 prompt'}), 400
+        return JSON_RESPONSE({'error': '请提供 prompt'}, status_code=400)
 
     if not API_KEY:
-        return jsonify({'error': '服务器未配置 API Key'}), 500
+        return JSON_RESPONSE({'error': '服务器未配置 API Key'}, status_code=500)
 
-    def generate():
+    async def generate():
+        pending = None
         try:
-            client = Anthropic(api_key=API_KEY)
-
-            with client.messages.stream(
+            async with anthropic_client.messages.stream(
                 model='claude-3-5-sonnet-20241022',
                 max_tokens=4096,
                 messages=[{'role': 'user', 'content': prompt}]
             ) as stream:
-                for text in stream.text_stream:
-                    yield f"data: {json.dumps({'text': text})}\n\n"
+                chunks = stream.text_stream.__aiter__()
+                while True:
+                    # 等待下一段文本；超时只发心跳，不取消正在进行的读取
+                    if pending is None:
+                        pending = asyncio.ensure_future(chunks.__anext__())
+                    done, _ = await asyncio.wait({pending}, timeout=SSE_HEARTBEAT_INTERVAL)
+                    if not done:
+                        yield _SSE_KEEPALIVE
+                        continue
+                    task, pending = pending, None
+                    try:
+                        text = task.result()
+                    except StopAsyncIteration:
+                        break
+                    yield _sse_frame({'text': text})
 
         except Exception as e:
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield _sse_frame({'error': str(e)})
+        finally:
+            # 客户端断开时取消尚未完成的读取
+            if pending is not None:
+                pending.cancel()
 
-    return Response(generate(), mimetype='text/event-stream')
+    return StreamingResponse(generate(), media_type='text/event-stream')
 
 
-@app.route('/health', methods=['GET'])
-def health():
+@app.get('/health')
+async def health():
     """健康检查"""
-    return jsonify({
+    return {
         'status': 'ok',
         'api_configured': bool(API_KEY)
-    })
+    }
 
 
 if __name__ == '__main__':
@@ -270,6 +385,8 @@ if __name__ == '__main__':
     print()
     print("访问地址: http://localhost:5000")
     print("API 端点: http://localhost:5000/api/chat")
+    print("批量端点: http://localhost:5000/api/batch")
     print("=" * 50)
 
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
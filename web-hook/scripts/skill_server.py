@@ -2,52 +2,152 @@
 """
 Skill Manager Server
 提供 skill 创建和使用的后端服务
+
+运行:
+    python skill_server.py                                # 本地开发
+    gunicorn -c gunicorn.conf.py skill_server:app         # 生产环境（多进程）
 """
 
+import asyncio
+import itertools
 import os
 import json
 import re
-from pathlib import Path
+import stat
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import List, Dict, Optional
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
 
-app = Flask(__name__)
-CORS(app)
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 配置
-SKILLS_BASE_DIR = Path(os.path.expanduser('~/.claude/skills'))
-STATIC_DIR = Path(__file__).parent.parent / 'templates'
+# 路径在模块加载时解析为普通字符串，请求路径上使用 os.path 拼接，避免 pathlib 对象开销
+SKILLS_BASE_DIR = os.path.expanduser('~/.claude/skills')
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
 
-def get_all_skills() -> List[Dict]:
-    """获取所有 skills 列表"""
-    skills = []
+# Claude API 请求超时（秒）
+CLAUDE_TIMEOUT = 30
 
-    for skill_dir in SKILLS_BASE_DIR.iterdir():
-        if not skill_dir.is_dir() or skill_dir.name.startswith('.'):
-            continue
+# 同时进行的 Claude 请求上限（超出的请求排队等待，避免触发 429 限流）
+CLAUDE_MAX_CONCURRENCY = 20
 
-        skill_md = skill_dir / 'SKILL.md'
-        if skill_md.exists():
-            # 读取 SKILL.md 获取描述
-            content = skill_md.read_text(encoding='utf-8')
-            description = extract_description(content)
+# 共享 HTTP 客户端连接池上限（总连接数 / 保持存活的空闲连接数）
+CLAUDE_MAX_CONNECTIONS = 100
+CLAUDE_MAX_KEEPALIVE = 20
 
-            skills.append({
-                'name': skill_dir.name,
-                'description': description,
-                'path': str(skill_dir)
-            })
+# 提取描述时读取 SKILL.md 的字节上限（extract_description 只使用前 10 行）
+DESCRIPTION_READ_BYTES = 4096
+
+# 使用 skill 时传给 Claude 的 SKILL.md 内容长度上限（字符）
+SKILL_CONTEXT_CHARS = 2000
+
+# 按 skill 缓存的条目数上限
+SKILL_CACHE_SIZE = 128
+
+# 使用 skill 时的系统提示模板
+SYSTEM_PROMPT_USE_SKILL = """You are a skill management assistant. The user is working with the following skill:
+
+{skill_context}
+
+Help the user use this skill effectively. Do NOT suggest modifying the skill content - skills are read-only.
+"""
+
+# 创建 skill / 普通对话时的系统提示
+SYSTEM_PROMPT_CREATE_SKILL = """You are a skill creation assistant. Help users create new skills by:
+1. Understanding their requirements
+2. Suggesting appropriate skill structure
+3. Generating SKILL.md content
+4. Providing any additional files needed
+
+IMPORTANT: You can only CREATE new skills, never MODIFY existing ones."""
+
+# skill 名称校验（整串匹配；不像 ^...$ 那样放过结尾换行）
+_is_valid_skill_name = re.compile(r'[a-z0-9-]+').fullmatch
+
+# 从消息中提取待创建 skill 名称的模式（模块加载时编译一次）
+_SKILL_INFO_PATTERNS = (
+    re.compile(r'创建[一个]?\s*skill\s*[叫名为]?\s*["\']?([a-z0-9-]+)["\']?', re.IGNORECASE),
+    re.compile(r'create\s+a?\s*skill\s*(?:called\s+|named\s+)?["\']?([a-z0-9-]+)["\']?', re.IGNORECASE),
+)
+
+# JSON 编解码：安装 orjson 时使用 orjson（更快、分配更少），否则回退到标准库 json
+JSON_RESPONSE = ORJSONResponse if orjson else JSONResponse
+_json_loads = orjson.loads if orjson else json.loads
+
+# Claude 请求并发限制
+_claude_semaphore = asyncio.Semaphore(CLAUDE_MAX_CONCURRENCY)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时创建共享的异步 HTTP 客户端，关闭时释放连接池"""
+    limits = httpx.Limits(max_connections=CLAUDE_MAX_CONNECTIONS,
+                          max_keepalive_connections=CLAUDE_MAX_KEEPALIVE)
+    app.state.client = httpx.AsyncClient(timeout=CLAUDE_TIMEOUT, http2=True, limits=limits)
+    try:
+        yield
+    finally:
+        await app.state.client.aclose()
 
-    return skills
+
+app = FastAPI(lifespan=lifespan, default_response_class=JSON_RESPONSE)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+def get_all_skills() -> Dict[str, List[str]]:
+    """获取所有 skills 列表（按列存储：names / descriptions / paths 下标一一对应）"""
+    skills = []
+
+    # os.scandir 的 DirEntry 自带目录项类型，判断目录无需逐个 stat；每个 skill 只 stat 一次 SKILL.md
+    with os.scandir(SKILLS_BASE_DIR) as entries:
+        for entry in entries:
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+
+            skill_md = os.path.join(entry.path, 'SKILL.md')
+            try:
+                st = os.stat(skill_md)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                skills.append((entry.name, entry.path, st.st_mtime_ns))
+
+    # 以各 skill 的 (名称, 路径, SKILL.md 修改时间) 作为缓存键：新增、删除或编辑 SKILL.md 都会失效
+    return _build_skill_listing(tuple(skills))
+
+@lru_cache(maxsize=1)
+def _build_skill_listing(skills: tuple) -> Dict[str, List[str]]:
+    """按扫描结果构建列表；描述按文件缓存，只重新读取发生变化的 SKILL.md"""
+    names, descriptions, paths = [], [], []
+
+    for name, path, mtime_ns in skills:
+        names.append(name)
+        descriptions.append(_skill_description(path, mtime_ns))
+        paths.append(path)
+
+    return {'names': names, 'descriptions': descriptions, 'paths': paths}
+
+@lru_cache(maxsize=SKILL_CACHE_SIZE)
+def _skill_description(skill_path: str, mtime_ns: int) -> str:
+    """读取 SKILL.md 开头部分获取描述（描述只取前几行）；以文件修改时间作为缓存键"""
+    with open(os.path.join(skill_path, 'SKILL.md'), 'rb') as f:
+        content = f.read(DESCRIPTION_READ_BYTES).decode('utf-8', errors='replace')
+    return extract_description(content)
 
 def extract_description(skill_md_content: str) -> str:
     """从 SKILL.md 提取描述"""
-    # 查找第一段描述
-    lines = skill_md_content.split('\n')
+    # 查找第一段描述；只需前 10 行，maxsplit 限制切分次数，不为整篇内容创建行列表
+    lines = skill_md_content.split('\n', 10)
     description_lines = []
 
-    for line in lines[2:10]:  # 跳过标题，取前几行
+    for line in itertools.islice(lines, 2, 10):  # 跳过标题，取前几行
         line = line.strip()
         if line and not line.startswith('#') and not line.startswith('|'):
             description_lines.append(line)
@@ -56,26 +156,49 @@ def extract_description(skill_md_content: str) -> str:
 
     return ' '.join(description_lines)[:150] if description_lines else '暂无描述'
 
+def _skill_md_mtime(skill_name: str) -> Optional[int]:
+    """返回 skill 的 SKILL.md 修改时间（纳秒）；文件不存在时返回 None"""
+    try:
+        st = os.stat(os.path.join(SKILLS_BASE_DIR, skill_name, 'SKILL.md'))
+    except OSError:
+        return None
+    return st.st_mtime_ns if stat.S_ISREG(st.st_mode) else None
+
 def get_skill_content(skill_name: str) -> Optional[Dict]:
     """获取 skill 完整内容"""
-    skill_dir = SKILLS_BASE_DIR / skill_name
-    if not skill_dir.exists():
+    mtime_ns = _skill_md_mtime(skill_name)
+    if mtime_ns is None:
         return None
+    return _load_skill_content(skill_name, mtime_ns)
 
-    skill_md = skill_dir / 'SKILL.md'
-    if not skill_md.exists():
-        return None
+@lru_cache(maxsize=SKILL_CACHE_SIZE)
+def _load_skill_content(skill_name: str, mtime_ns: int) -> Dict:
+    """读取 SKILL.md；以文件修改时间作为缓存键，文件变化后自动重新读取"""
+    skill_dir = os.path.join(SKILLS_BASE_DIR, skill_name)
+    with open(os.path.join(skill_dir, 'SKILL.md'), encoding='utf-8') as f:
+        content = f.read()
 
     return {
         'name': skill_name,
-        'content': skill_md.read_text(encoding='utf-8'),
-        'path': str(skill_dir)
+        'content': content,
+        'path': skill_dir
     }
 
-def call_claude_api(message: str, config: Dict, skill_context: Optional[str] = None) -> str:
-    """调用 Claude API"""
-    import requests
+def get_skill_context(skill_name: str) -> Optional[str]:
+    """获取使用 skill 时传给 Claude 的上下文（SKILL.md 前 SKILL_CONTEXT_CHARS 个字符）"""
+    mtime_ns = _skill_md_mtime(skill_name)
+    if mtime_ns is None:
+        return None
+    return _build_skill_context(skill_name, mtime_ns)
+
+@lru_cache(maxsize=SKILL_CACHE_SIZE)
+def _build_skill_context(skill_name: str, mtime_ns: int) -> str:
+    """构建 skill 上下文；与内容缓存使用相同的键，文件变化后自动重建"""
+    content = _load_skill_content(skill_name, mtime_ns)['content']
+    return f"Skill: {skill_name}\n\n{content[:SKILL_CONTEXT_CHARS]}"
 
+async def call_claude_api(message: str, config: Dict, skill_context: Optional[str] = None) -> str:
+    """调用 Claude API（使用应用共享的 httpx.AsyncClient，不阻塞事件循环）"""
     headers = {
         'x-api-key': config['authToken'],
         'anthropic-version': '2023-06-01',
@@ -85,20 +208,9 @@ def call_claude_api(message: str, config: Dict, skill_context: Optional[str] = N
 
     # 构建系统提示
     if skill_context:
-        system_prompt = f"""You are a skill management assistant. The user is working with the following skill:
-
-{skill_context}
-
-Help the user use this skill effectively. Do NOT suggest modifying the skill content - skills are read-only.
-"""
+        system_prompt = SYSTEM_PROMPT_USE_SKILL.format(skill_context=skill_context)
     else:
-        system_prompt = """You are a skill creation assistant. Help users create new skills by:
-1. Understanding their requirements
-2. Suggesting appropriate skill structure
-3. Generating SKILL.md content
-4. Providing any additional files needed
-
-IMPORTANT: You can only CREATE new skills, never MODIFY existing ones."""
+        system_prompt = SYSTEM_PROMPT_CREATE_SKILL
 
     messages = [{
         'role': 'user',
@@ -113,21 +225,22 @@ IMPORTANT: You can only CREATE new skills, never MODIFY existing ones."""
     }
 
     url = f"{config['baseUrl'].rstrip('/')}/v1/messages"
-    response = requests.post(url, headers=headers, json=body, timeout=30)
+    async with _claude_semaphore:
+        response = await app.state.client.post(url, headers=headers, json=body)
     response.raise_for_status()
 
-    data = response.json()
+    data = _json_loads(response.content)
     return data['content'][0]['text']
 
-def create_skill_from_description(name: str, description: str, config: Dict) -> Dict:
+async def create_skill_from_description(name: str, description: str, config: Dict) -> Dict:
     """根据描述创建新 skill"""
     # 验证 skill 名称
-    if not re.match(r'^[a-z0-9-]+$', name):
+    if not _is_valid_skill_name(name):
         return {'success': False, 'error': 'Skill 名称只能包含小写字母、数字和连字符'}
 
     # 检查是否已存在
-    skill_dir = SKILLS_BASE_DIR / name
-    if skill_dir.exists():
+    skill_dir = os.path.join(SKILLS_BASE_DIR, name)
+    if os.path.exists(skill_dir):
         return {'success': False, 'error': 'Skill 已存在'}
 
     try:
@@ -157,81 +270,100 @@ List of files in this skill (if any).
 Only output the SKILL.md content, nothing else.
 """
 
-        response = call_claude_api(prompt, config)
+        response = await call_claude_api(prompt, config)
 
         # 创建 skill 目录
-        skill_dir.mkdir(parents=True, exist_ok=True)
+        os.makedirs(skill_dir, exist_ok=True)
 
         # 写入 SKILL.md
-        skill_md = skill_dir / 'SKILL.md'
-        skill_md.write_text(response, encoding='utf-8')
+        with open(os.path.join(skill_dir, 'SKILL.md'), 'w', encoding='utf-8') as f:
+            f.write(response)
 
         return {
             'success': True,
             'skill': {
                 'name': name,
                 'description': description,
-                'path': str(skill_dir)
+                'path': skill_dir
             }
         }
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
-@app.route('/')
-def index():
+async def _read_json(request: Request, expected_type: type = dict):
+    """
+    读取并解析请求体 JSON；直接消费请求流，不在 Request 对象上缓存原始字节
+
+    Returns:
+        (数据, None)；请求体为空、不是合法 JSON 或类型不符时返回 (None, 400 错误响应)
+    """
+    body = b''.join([chunk async for chunk in request.stream()])
+    try:
+        data = _json_loads(body)
+    except ValueError:
+        return None, JSON_RESPONSE({'error': '请求体必须是合法的 JSON'}, status_code=400)
+    if not isinstance(data, expected_type):
+        kind = '对象' if expected_type is dict else '数组'
+        return None, JSON_RESPONSE({'error': f'请求体必须是 JSON {kind}'}, status_code=400)
+    return data, None
+
+@app.get('/')
+async def index():
     """主页"""
-    return send_from_directory(STATIC_DIR, 'skill-manager.html')
+    return FileResponse(os.path.join(STATIC_DIR, 'skill-manager.html'))
 
-@app.route('/api/skills', methods=['GET'])
-def list_skills():
+@app.get('/api/skills')
+async def list_skills():
     """获取所有 skills"""
     try:
-        skills = get_all_skills()
-        return jsonify(skills)
+        # 目录扫描与文件读取放到线程中，避免阻塞事件循环
+        skills = await asyncio.to_thread(get_all_skills)
+        return skills
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return JSON_RESPONSE({'error': str(e)}, status_code=500)
 
-@app.route('/api/skills/<skill_name>', methods=['GET'])
-def get_skill(skill_name: str):
+@app.get('/api/skills/{skill_name}')
+async def get_skill(skill_name: str):
     """获取 skill 详情"""
     try:
         skill = get_skill_content(skill_name)
         if not skill:
-            return jsonify({'error': 'Skill not found'}), 404
-        return jsonify(skill)
+            return JSON_RESPONSE({'error': 'Skill not found'}, status_code=404)
+        return skill
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return JSON_RESPONSE({'error': str(e)}, status_code=500)
 
-@app.route('/api/chat', methods=['POST'])
-def chat():
+@app.post('/api/chat')
+async def chat(request: Request):
     """处理聊天请求"""
     try:
-        data = request.json
+        data, error = await _read_json(request)
+        if error is not None:
+            return error
         message = data.get('message', '')
         skill = data.get('skill')
         config = data.get('config', {})
         intent = data.get('intent', 'chat')
 
         if not message:
-            return jsonify({'error': 'Message is required'}), 400
+            return JSON_RESPONSE({'error': 'Message is required'}, status_code=400)
 
         if not config.get('authToken'):
-            return jsonify({'error': 'API config is required'}), 400
+            return JSON_RESPONSE({'error': 'API config is required'}, status_code=400)
 
         # 如果是使用 skill
         if skill and intent == 'use_skill':
-            skill_content = get_skill_content(skill)
-            if not skill_content:
-                return jsonify({'error': 'Skill not found'}), 404
+            skill_context = get_skill_context(skill)
+            if not skill_context:
+                return JSON_RESPONSE({'error': 'Skill not found'}, status_code=404)
 
-            skill_context = f"Skill: {skill}\n\n{skill_content['content'][:2000]}"
-            response = call_claude_api(message, config, skill_context)
+            response = await call_claude_api(message, config, skill_context)
 
-            return jsonify({
+            return {
                 'response': response,
                 'action': 'skill_used',
                 'skill': skill
-            })
+            }
 
         # 如果是创建 skill
         elif intent == 'create_skill':
@@ -239,46 +371,41 @@ def chat():
             skill_name, skill_desc = extract_skill_info(message)
 
             if skill_name:
-                result = create_skill_from_description(skill_name, skill_desc, config)
+                result = await create_skill_from_description(skill_name, skill_desc, config)
                 if result['success']:
-                    return jsonify({
+                    return {
                         'response': f"✅ Skill '{skill_name}' 创建成功！\n\n{result['skill']['description']}",
                         'action': 'skill_created',
                         'skill': result['skill']
-                    })
+                    }
                 else:
-                    return jsonify({
+                    return {
                         'response': f"❌ 创建失败: {result['error']}",
                         'action': 'error'
-                    })
+                    }
             else:
                 # 让 Claude 帮助明确需求
-                response = call_claude_api(
+                response = await call_claude_api(
                     f"User wants to create a skill. Their message: {message}\n\n"
                     "Ask clarifying questions to understand what skill they want to create. "
                     "Specifically ask for: 1) Skill name, 2) What it should do.",
                     config
                 )
-                return jsonify({'response': response, 'action': 'clarify'})
+                return {'response': response, 'action': 'clarify'}
 
         # 普通对话
         else:
-            response = call_claude_api(message, config)
-            return jsonify({'response': response, 'action': 'chat'})
+            response = await call_claude_api(message, config)
+            return {'response': response, 'action': 'chat'}
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return JSON_RESPONSE({'error': str(e)}, status_code=500)
 
 def extract_skill_info(message: str) -> tuple[Optional[str], str]:
     """从消息中提取 skill 信息"""
     # 简单的模式匹配
-    patterns = [
-        r'创建[一个]?\s*skill\s*[叫名为]?\s*["\']?([a-z0-9-]+)["\']?',
-        r'create\s+a?\s*skill\s*(?:called\s+|named\s+)?["\']?([a-z0-9-]+)["\']?',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, message, re.IGNORECASE)
+    for pattern in _SKILL_INFO_PATTERNS:
+        match = pattern.search(message)
         if match:
             return match.group(1), message
 
@@ -290,4 +417,5 @@ if __name__ == '__main__':
     print(f"🌐 Server running at: http://localhost:5000")
     print()
 
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
\ No newline at end of file